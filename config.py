@@ -2,6 +2,7 @@
 Configuration management for arXiv Health Monitor
 """
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -14,7 +15,11 @@ DATA_DIR = PROJECT_ROOT / "data"
 PAPERS_DIR = DATA_DIR / "papers"
 WEBSITE_DIR = PROJECT_ROOT / "docs"
 WEBSITE_PAPERS_DIR = WEBSITE_DIR / "papers"
-DATABASE_PATH = DATA_DIR / "arxiv_health.json"
+DATABASE_PATH = DATA_DIR / "arxiv_health.db"
+LEGACY_DATABASE_PATH = DATA_DIR / "arxiv_health.json"  # TinyDB file, imported on first run
+AI_CACHE_DIR = DATA_DIR / "ai_cache"
+S2_CACHE_DIR = DATA_DIR / "s2_cache"
+JINJA_CACHE_DIR = PROJECT_ROOT / ".jinja_cache"  # Compiled template bytecode
 
 # Create directories if they don't exist
 DATA_DIR.mkdir(exist_ok=True)
@@ -22,32 +27,119 @@ PAPERS_DIR.mkdir(exist_ok=True)
 WEBSITE_DIR.mkdir(exist_ok=True)
 WEBSITE_PAPERS_DIR.mkdir(exist_ok=True)
 
-# API Configuration
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
-GROK_API_KEY = os.getenv("GROK_API_KEY", "")
-AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini").lower()
-
-# arXiv Search Configuration
-MAX_RESULTS_PER_RUN = int(os.getenv("MAX_RESULTS_PER_RUN", "50"))
-DAYS_TO_LOOK_BACK = int(os.getenv("DAYS_TO_LOOK_BACK", "7"))
-
-# Website Configuration
-SITE_TITLE = os.getenv("SITE_TITLE", "Health AI Hub")
-SITE_DESCRIPTION = os.getenv("SITE_DESCRIPTION", "AI-powered medical research discovery | Latest health AI papers from arXiv, curated daily")
-SITE_TAGLINE = os.getenv("SITE_TAGLINE", "Your daily dose of cutting-edge health AI research")
-
-# Social Media
-TWITTER_HANDLE = os.getenv("TWITTER_HANDLE", "@ArXiv_Health")
-SUBSTACK_URL = os.getenv("SUBSTACK_URL", "https://bryantegomoh.substack.com")
-CONTACT_EMAIL = os.getenv("CONTACT_EMAIL", "bryan@arxiv-health.org")
-
-# Feature Flags
-ENABLE_DARK_MODE = os.getenv("ENABLE_DARK_MODE", "true").lower() == "true"
-ENABLE_BOOKMARKS = os.getenv("ENABLE_BOOKMARKS", "true").lower() == "true"
-ENABLE_TRENDING = os.getenv("ENABLE_TRENDING", "true").lower() == "true"
-ENABLE_CHAT_ASSISTANT = os.getenv("ENABLE_CHAT_ASSISTANT", "true").lower() == "true"
+
+def _env_bool(name: str, default: str = "true") -> bool:
+    """Read a "true"/"false" environment variable"""
+    return os.getenv(name, default).lower() == "true"
+
+
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Settings read from the environment, resolved once at import"""
+
+    # API Configuration
+    GEMINI_API_KEY: str
+    OPENAI_API_KEY: str
+    ANTHROPIC_API_KEY: str
+    GROK_API_KEY: str
+    AI_PROVIDER: str
+    AI_MAX_WORKERS: int  # Concurrent papers in flight
+
+    # arXiv Search Configuration
+    MAX_RESULTS_PER_RUN: int
+    DAYS_TO_LOOK_BACK: int
+    ARXIV_REQUEST_INTERVAL: float  # Seconds between PDF requests
+
+    # Website Configuration
+    SITE_TITLE: str
+    SITE_DESCRIPTION: str
+    SITE_TAGLINE: str
+    SITE_URL: str  # Public base URL, used for sitemap.xml and the RSS feed
+
+    # Social Media
+    TWITTER_HANDLE: str
+    SUBSTACK_URL: str
+    CONTACT_EMAIL: str
+
+    # Feature Flags
+    ENABLE_DARK_MODE: bool
+    ENABLE_BOOKMARKS: bool
+    ENABLE_TRENDING: bool
+    ENABLE_CHAT_ASSISTANT: bool
+    ENABLE_AI_CACHE: bool
+    ENABLE_CITATIONS: bool  # Fetch citation counts from Semantic Scholar
+    PRECOMPRESS_ASSETS: bool  # Write .gz copies of site files and paper pages
+    BUNDLE_PAPER_PAGES: bool  # Write paper pages into papers.tar instead of papers/
+    MINIFY_HTML: bool  # Strip indentation and blank lines from generated pages
+    ALL_PAPERS_PAGE: bool  # Also write all-papers.html listing every paper on one page
+
+    # Validation settings
+    MIN_KEYWORD_HITS: int  # Keyword matches required before asking the AI (0 disables)
+
+
+CONFIG = _Config(
+    GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", ""),
+    OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", ""),
+    ANTHROPIC_API_KEY=os.getenv("ANTHROPIC_API_KEY", ""),
+    GROK_API_KEY=os.getenv("GROK_API_KEY", ""),
+    AI_PROVIDER=os.getenv("AI_PROVIDER", "gemini").lower(),
+    AI_MAX_WORKERS=int(os.getenv("AI_MAX_WORKERS", "8")),
+    MAX_RESULTS_PER_RUN=int(os.getenv("MAX_RESULTS_PER_RUN", "50")),
+    DAYS_TO_LOOK_BACK=int(os.getenv("DAYS_TO_LOOK_BACK", "7")),
+    ARXIV_REQUEST_INTERVAL=float(os.getenv("ARXIV_REQUEST_INTERVAL", "3")),
+    SITE_TITLE=os.getenv("SITE_TITLE", "Health AI Hub"),
+    SITE_DESCRIPTION=os.getenv("SITE_DESCRIPTION", "AI-powered medical research discovery | Latest health AI papers from arXiv, curated daily"),
+    SITE_TAGLINE=os.getenv("SITE_TAGLINE", "Your daily dose of cutting-edge health AI research"),
+    SITE_URL=os.getenv("SITE_URL", "https://arxiv-health.org").rstrip("/"),
+    TWITTER_HANDLE=os.getenv("TWITTER_HANDLE", "@ArXiv_Health"),
+    SUBSTACK_URL=os.getenv("SUBSTACK_URL", "https://bryantegomoh.substack.com"),
+    CONTACT_EMAIL=os.getenv("CONTACT_EMAIL", "bryan@arxiv-health.org"),
+    ENABLE_DARK_MODE=_env_bool("ENABLE_DARK_MODE"),
+    ENABLE_BOOKMARKS=_env_bool("ENABLE_BOOKMARKS"),
+    ENABLE_TRENDING=_env_bool("ENABLE_TRENDING"),
+    ENABLE_CHAT_ASSISTANT=_env_bool("ENABLE_CHAT_ASSISTANT"),
+    ENABLE_AI_CACHE=_env_bool("ENABLE_AI_CACHE"),
+    ENABLE_CITATIONS=_env_bool("ENABLE_CITATIONS", "false"),
+    PRECOMPRESS_ASSETS=_env_bool("PRECOMPRESS_ASSETS", "false"),
+    BUNDLE_PAPER_PAGES=_env_bool("BUNDLE_PAPER_PAGES", "false"),
+    MINIFY_HTML=_env_bool("MINIFY_HTML", "false"),
+    ALL_PAPERS_PAGE=_env_bool("ALL_PAPERS_PAGE", "false"),
+    MIN_KEYWORD_HITS=int(os.getenv("MIN_KEYWORD_HITS", "2")),
+)
+
+# Module-level aliases so existing `config.X` lookups keep working
+GEMINI_API_KEY = CONFIG.GEMINI_API_KEY
+OPENAI_API_KEY = CONFIG.OPENAI_API_KEY
+ANTHROPIC_API_KEY = CONFIG.ANTHROPIC_API_KEY
+GROK_API_KEY = CONFIG.GROK_API_KEY
+AI_PROVIDER = CONFIG.AI_PROVIDER
+AI_MAX_WORKERS = CONFIG.AI_MAX_WORKERS
+
+MAX_RESULTS_PER_RUN = CONFIG.MAX_RESULTS_PER_RUN
+DAYS_TO_LOOK_BACK = CONFIG.DAYS_TO_LOOK_BACK
+ARXIV_REQUEST_INTERVAL = CONFIG.ARXIV_REQUEST_INTERVAL
+
+SITE_TITLE = CONFIG.SITE_TITLE
+SITE_DESCRIPTION = CONFIG.SITE_DESCRIPTION
+SITE_TAGLINE = CONFIG.SITE_TAGLINE
+SITE_URL = CONFIG.SITE_URL
+
+TWITTER_HANDLE = CONFIG.TWITTER_HANDLE
+SUBSTACK_URL = CONFIG.SUBSTACK_URL
+CONTACT_EMAIL = CONFIG.CONTACT_EMAIL
+
+ENABLE_DARK_MODE = CONFIG.ENABLE_DARK_MODE
+ENABLE_BOOKMARKS = CONFIG.ENABLE_BOOKMARKS
+ENABLE_TRENDING = CONFIG.ENABLE_TRENDING
+ENABLE_CHAT_ASSISTANT = CONFIG.ENABLE_CHAT_ASSISTANT
+ENABLE_AI_CACHE = CONFIG.ENABLE_AI_CACHE
+ENABLE_CITATIONS = CONFIG.ENABLE_CITATIONS
+PRECOMPRESS_ASSETS = CONFIG.PRECOMPRESS_ASSETS
+BUNDLE_PAPER_PAGES = CONFIG.BUNDLE_PAPER_PAGES
+MINIFY_HTML = CONFIG.MINIFY_HTML
+ALL_PAPERS_PAGE = CONFIG.ALL_PAPERS_PAGE
+
+MIN_KEYWORD_HITS = CONFIG.MIN_KEYWORD_HITS
 
 # Medical/Health Keywords for arXiv search
 HEALTH_KEYWORDS = [
@@ -98,5 +190,9 @@ ARXIV_CATEGORIES = [
     "physics.med-ph",  # Medical Physics
 ]
 
+# Prebuilt arXiv query fragments (keywords limited to avoid query length issues)
+HEALTH_KEYWORD_QUERY = " OR ".join(f'ti:"{k}" OR abs:"{k}"' for k in HEALTH_KEYWORDS[:30])
+ARXIV_CATEGORY_QUERY = " OR ".join(f"cat:{c}" for c in ARXIV_CATEGORIES)
+
 # Validation settings
 MIN_RELEVANCE_SCORE = 0.6  # Minimum AI relevance score (0-1) to include a paper
@@ -8,6 +8,9 @@ Fetches, filters, summarizes, and publishes medical/health papers from arXiv.
 import sys
 import os
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -21,10 +24,101 @@ if sys.platform == 'win32':
 sys.path.insert(0, str(Path(__file__).parent))
 
 import config
-from src.arxiv_client import ArxivHealthClient
-from src.ai_summarizer import AISummarizer
 from src.database import PaperDatabase
-from src.website_generator import WebsiteGenerator
+from src.utils import prefetch
+
+# Papers the arXiv fetcher may buffer ahead of the processing loop
+PREFETCH_SIZE = 16
+
+# Relevant papers stored per batch, so a crash late in the run only loses
+# the papers processed since the last batch
+STORE_BATCH_SIZE = 25
+
+# ArxivHealthClient, AISummarizer and WebsiteGenerator are imported where
+# they are used so `--help` and `--rebuild-site` don't load the arxiv and
+# AI provider SDKs
+
+
+def process_paper(paper, summarizer, db, db_lock):
+    """
+    Run the relevance check and summarization for a single paper
+
+    Safe to call from worker threads: database access is serialized through
+    db_lock, and progress messages are collected and returned instead of
+    being printed so each paper's output stays together.
+
+    Returns:
+        Tuple of (status, log_lines, record) where status is 'skipped',
+        'rejected' or 'relevant', and record is (paper, summary,
+        relevance_info) for relevant papers, None otherwise
+    """
+    log = []
+
+    # Check if already processed
+    with db_lock:
+        exists = db.paper_exists(paper['arxiv_id'])
+    if exists:
+        log.append(f"  [SKIP] Already in database, skipping")
+        return 'skipped', log, None
+
+    # Skip the AI call entirely for papers with too few keyword hits
+    hits = summarizer.prefilter(paper)
+    if hits < config.MIN_KEYWORD_HITS:
+        log.append(f"  [REJECT] Too few health keywords ({hits} hits)")
+        return 'rejected', log, None
+
+    # Check relevance and generate summary with a single AI call
+    relevance, summary = summarizer.analyze_paper(paper)
+    is_relevant, score, reasoning, domains, ai_app = relevance
+
+    if not is_relevant or score < config.MIN_RELEVANCE_SCORE:
+        log.append(f"  [REJECT] Not relevant (score: {score:.2f})")
+        log.append(f"    Reason: {reasoning}")
+        return 'rejected', log, None
+
+    log.append(f"  [OK] Relevant! Score: {score:.2f}")
+    log.append(f"    Domains: {', '.join(domains)}")
+
+    relevance_info = {
+        'relevance_score': score,
+        'reasoning': reasoning,
+        'ai_health_application': ai_app
+    }
+    return 'relevant', log, (paper, summary, relevance_info)
+
+
+def enrich_with_citations(db, new_papers, refresh_stale=True):
+    """
+    Fetch Semantic Scholar data for new papers and papers with stale data
+
+    New papers are updated in place before they are stored; existing papers
+    whose cached data is older than a week are refreshed in the database.
+    All lookups go through one batched, locally cached request sequence.
+
+    Args:
+        db: PaperDatabase
+        new_papers: Paper dictionaries about to be added
+        refresh_stale: Also refresh existing papers with stale data
+    """
+    from src.semantic_scholar import SemanticScholarAPI, apply_s2_data
+
+    stale_papers = db.get_papers_needing_s2_refresh() if refresh_stale else []
+    papers = list(new_papers) + stale_papers
+    if not papers:
+        return
+
+    print(f"\nFetching citation data for {len(papers)} papers...")
+    results = SemanticScholarAPI().get_papers_batch([paper['arxiv_id'] for paper in papers])
+
+    # Papers whose lookup failed are left as they are and retried next run
+    fetched_at = datetime.now().isoformat()
+    for paper in papers:
+        if paper['arxiv_id'] in results:
+            apply_s2_data(paper, results[paper['arxiv_id']], fetched_at)
+
+    refreshed = [paper for paper in stale_papers if paper['arxiv_id'] in results]
+    if refreshed:
+        db.update_papers(refreshed)
 
 
 def main():
@@ -51,6 +145,12 @@ def main():
         default=config.AI_PROVIDER,
         help=f'AI provider for summarization (default: {config.AI_PROVIDER})'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=config.AI_MAX_WORKERS,
+        help=f'Number of papers processed concurrently (default: {config.AI_MAX_WORKERS})'
+    )
     parser.add_argument(
         '--skip-download',
         action='store_true',
@@ -71,15 +171,18 @@ def main():
     print(f"AI Provider: {args.provider}")
     print(f"Max Results: {args.max_results}")
     print(f"Days Back: {args.days_back}")
+    print(f"Workers: {args.workers}")
     print("=" * 70)
     print()
 
     # Initialize components
     db = PaperDatabase()
-    arxiv_client = ArxivHealthClient()
 
     if args.rebuild_site:
+        from src.website_generator import WebsiteGenerator
+
         print("Rebuilding website from existing database...")
+        db.refresh_trending_scores()
         papers = db.get_all_papers()
         stats = db.get_statistics()
 
@@ -91,8 +194,15 @@ def main():
         print(f"Total papers: {len(papers)}")
         print(f"Website: {config.WEBSITE_DIR / 'index.html'}")
         print("=" * 70)
+        db.close()
         return
 
+    from src.arxiv_client import ArxivHealthClient
+    from src.ai_summarizer import AISummarizer
+    from src.website_generator import WebsiteGenerator
+
+    arxiv_client = ArxivHealthClient()
+
     # Initialize AI summarizer
     try:
         summarizer = AISummarizer(provider=args.provider)
@@ -101,73 +211,106 @@ def main():
         print("Please check your .env file and ensure the API key is set.")
         sys.exit(1)
 
-    # Fetch papers from arXiv
-    print("\n[1/4] Fetching papers from arXiv...")
+    # Fetch papers from arXiv and process them as they arrive
+    print("\n[1/4] Fetching and processing papers from arXiv...")
     print("-" * 70)
-    papers = arxiv_client.fetch_recent_papers(
-        max_results=args.max_results,
-        days_back=args.days_back
+    papers = prefetch(
+        arxiv_client.fetch_recent_papers(
+            max_results=args.max_results,
+            days_back=args.days_back
+        ),
+        maxsize=PREFETCH_SIZE
     )
 
-    if not papers:
-        print("No papers found. Exiting.")
-        return
-
-    # Process each paper
-    print(f"\n[2/4] Processing {len(papers)} papers...")
-    print("-" * 70)
-
-    new_papers = 0
+    fetched_papers = 0
     skipped_papers = 0
     irrelevant_papers = 0
-
-    for i, paper in enumerate(papers, 1):
-        print(f"\n[{i}/{len(papers)}] {paper['title'][:70]}...")
-
-        # Check if already processed
-        if db.paper_exists(paper['arxiv_id']):
-            print(f"  [SKIP] Already in database, skipping")
+    failed_papers = 0
+    new_papers = 0
+    relevant_records = []
+    db_lock = threading.Lock()
+
+    def store(refresh_stale=False):
+        """Download PDFs and citations for the pending relevant papers and add them"""
+        nonlocal new_papers
+        if relevant_records and not args.skip_download:
+            print(f"\nDownloading {len(relevant_records)} PDFs...")
+            pdf_paths = arxiv_client.download_pdfs([paper for paper, _, _ in relevant_records])
+            for paper, _, _ in relevant_records:
+                paper['pdf_path'] = pdf_paths.get(paper['arxiv_id'])
+
+        # Citation counts from Semantic Scholar; the stale refresh touches
+        # the database, but only runs once the workers have finished
+        if config.ENABLE_CITATIONS:
+            enrich_with_citations(db, [paper for paper, _, _ in relevant_records],
+                                  refresh_stale=refresh_stale)
+
+        # Add to database in one transaction
+        if relevant_records:
+            with db_lock:
+                new_papers += db.bulk_add_papers(relevant_records)
+        relevant_records.clear()
+
+    def report(index, paper, future):
+        """Print one finished paper's results and update the counters"""
+        nonlocal skipped_papers, irrelevant_papers, failed_papers
+        print(f"\n[{index}] {paper['title'][:70]}...")
+        try:
+            status, log, record = future.result()
+        except Exception as e:
+            # One bad paper shouldn't take the rest of the run down with it
+            print(f"  [ERROR] Processing failed: {e}")
+            failed_papers += 1
+            return
+
+        for line in log:
+            print(line)
+
+        if status == 'skipped':
             skipped_papers += 1
-            continue
-
-        # Check relevance with AI
-        print(f"  Checking medical/health relevance...")
-        is_relevant, score, reasoning, domains, ai_app = summarizer.check_relevance(paper)
-
-        if not is_relevant or score < config.MIN_RELEVANCE_SCORE:
-            print(f"  [REJECT] Not relevant (score: {score:.2f})")
-            print(f"    Reason: {reasoning}")
+        elif status == 'rejected':
             irrelevant_papers += 1
-            continue
-
-        print(f"  [OK] Relevant! Score: {score:.2f}")
-        print(f"    Domains: {', '.join(domains)}")
-
-        # Generate summary
-        print(f"  Generating AI summary...")
-        summary = summarizer.summarize_paper(paper)
-
-        # Download PDF
-        if not args.skip_download:
-            print(f"  Downloading PDF...")
-            pdf_path = arxiv_client.download_pdf(paper)
-            paper['pdf_path'] = pdf_path
+        else:
+            relevant_records.append(record)
+            if len(relevant_records) >= STORE_BATCH_SIZE:
+                print(f"\nStoring {len(relevant_records)} relevant papers...")
+                store()
+
+    # Papers are independent and the AI calls are network-bound, so process
+    # them concurrently while the fetcher keeps paging in results. Results
+    # are reported in arrival order, and the number of papers in flight is
+    # capped so a slow AI provider applies backpressure to the fetcher.
+    workers = max(1, args.workers)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for paper in papers:
+            fetched_papers += 1
+            future = executor.submit(process_paper, paper, summarizer, db, db_lock)
+            pending.append((fetched_papers, paper, future))
+
+            while pending and (pending[0][2].done() or len(pending) > 2 * workers):
+                report(*pending.popleft())
+
+        while pending:
+            report(*pending.popleft())
+
+    if not fetched_papers:
+        print("No papers found. Exiting.")
+        db.close()
+        return
 
-        # Add to database
-        relevance_info = {
-            'relevance_score': score,
-            'reasoning': reasoning,
-            'ai_health_application': ai_app
-        }
-        db.add_paper(paper, summary, relevance_info)
-        new_papers += 1
+    print(f"\n[2/4] Storing {len(relevant_records)} relevant papers...")
+    print("-" * 70)
 
-        print(f"  [DONE] Paper processed and added to database")
+    # The last partial batch, plus the stale citation refresh for papers
+    # already in the database
+    store(refresh_stale=True)
 
     # Generate website
     print(f"\n[3/4] Generating website...")
     print("-" * 70)
 
+    db.refresh_trending_scores()
     papers = db.get_all_papers()
     stats = db.get_statistics()
 
@@ -180,10 +323,12 @@ def main():
     # Summary
     print("\n[4/4] Summary")
     print("=" * 70)
-    print(f"Papers fetched from arXiv: {len(papers)}")
+    print(f"Papers fetched from arXiv: {fetched_papers}")
     print(f"New papers added: {new_papers}")
     print(f"Skipped (already in DB): {skipped_papers}")
     print(f"Rejected (not relevant): {irrelevant_papers}")
+    if failed_papers:
+        print(f"Failed (errors): {failed_papers}")
     print(f"\nTotal papers in database: {stats['total_papers']}")
     print(f"Medical domains: {len(stats['domains'])}")
     print(f"\nTop 5 domains:")
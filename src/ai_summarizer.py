@@ -3,13 +3,156 @@ AI-powered paper summarization with multi-provider support
 """
 import json
 import re
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 import config
+from src.utils import DiskCache
+
+# Abstracts are cut to this many characters in prompts; the relevance
+# signal is almost always in the opening sentences
+MAX_ABSTRACT_CHARS = 1500
+
+# Instructions and response schemas are identical for every paper, so they
+# go in the system message and only the paper itself is sent per request
+_RELEVANCE_SCHEMA = """{
+    "is_relevant": true/false,
+    "relevance_score": 0.0-1.0,
+    "reasoning": "brief explanation",
+    "medical_domains": ["list", "of", "relevant", "medical", "domains"],
+    "ai_health_application": "describe AI application to health if applicable"
+}"""
+
+_SUMMARY_SCHEMA = """{
+    "summary": "2-3 sentence overview of the paper's main contribution and findings",
+    "key_points": [
+        "5-7 specific bullet points covering methodology, results, and implications"
+    ],
+    "medical_relevance": "Why this matters for medicine/health (1-2 sentences)",
+    "keywords": ["list", "of", "5-8", "relevant", "keywords"],
+    "medical_domains": ["specific", "medical", "fields"],
+    "methodology": "Brief description of methods used",
+    "key_findings": "Main results or discoveries",
+    "clinical_impact": "Potential clinical or practical impact",
+    "limitations": "Any noted limitations or caveats",
+    "future_directions": "Suggested future research directions if mentioned"
+}"""
+
+
+def _nested(schema: str) -> str:
+    """Indent a schema's continuation lines so it can be nested one level"""
+    return schema.replace("\n", "\n    ")
+
+
+SYSTEM_PROMPT_RELEVANCE = f"""Analyze if the research paper you are given is relevant to medicine, healthcare, health, biosecurity, or medical AI/applications.
+
+Respond in JSON format:
+{_RELEVANCE_SCHEMA}
+
+Be strict: only mark as relevant if there's clear connection to medicine, health, biosecurity, or medical AI applications."""
+
+SYSTEM_PROMPT_SUMMARY = f"""Analyze and summarize the medical/health research paper you are given in detail.
+
+Provide a comprehensive analysis in JSON format:
+{_SUMMARY_SCHEMA}
+
+Be specific, technical, and focus on practical medical/health implications."""
+
+SYSTEM_PROMPT_ANALYSIS = f"""Analyze the research paper you are given. First decide if it is relevant to medicine, healthcare, health, biosecurity, or medical AI/applications. If it is relevant, also summarize it in detail.
+
+Respond in JSON format:
+{{
+    "relevance": {_nested(_RELEVANCE_SCHEMA)},
+    "summary": {_nested(_SUMMARY_SCHEMA)}
+}}
+
+Be strict: only mark as relevant if there's clear connection to medicine, health, biosecurity, or medical AI applications.
+If the paper is not relevant, set "summary" to null.
+For relevant papers, be specific, technical, and focus on practical medical/health implications."""
+
+# Per-paper user prompts, filled from _prompt_fields() with format_map; the
+# precision on {abstract} applies the MAX_ABSTRACT_CHARS cut
+_RELEVANCE_PROMPT = f"""Title: {{title}}
+
+Abstract: {{abstract:.{MAX_ABSTRACT_CHARS}}}
+
+Primary Category: {{primary_category}}
+Categories: {{categories_str}}"""
+
+_PAPER_PROMPT = f"""Title: {{title}}
+
+Authors: {{authors_str}}
+
+Abstract: {{abstract:.{MAX_ABSTRACT_CHARS}}}
+
+Primary Category: {{primary_category}}
+All Categories: {{categories_str}}"""
+
+_DECODER = json.JSONDecoder()
+
+
+def _extract_json(text: str) -> Optional[Dict]:
+    """
+    Extract the first JSON object embedded in a free-text AI response
+
+    Decoding stops at the end of the object, so trailing prose (or a second
+    object) after it is ignored.
+
+    Args:
+        text: AI response text
+
+    Returns:
+        Parsed object, or None if the text contains no JSON object
+    """
+    start = text.find('{')
+    while start >= 0:
+        try:
+            obj, _ = _DECODER.raw_decode(text, start)
+        except ValueError:
+            pass
+        else:
+            if isinstance(obj, dict):
+                return obj
+        start = text.find('{', start + 1)
+    return None
+
+
+def _prompt_fields(paper: Dict) -> Dict:
+    """
+    Collect the values the per-paper prompts are filled from
+
+    Args:
+        paper: Paper dictionary
+
+    Returns:
+        Dictionary for format_map
+    """
+    authors = paper.get('authors', [])
+    return {
+        'title': paper.get('title', ''),
+        'abstract': paper.get('abstract', ''),
+        'primary_category': paper.get('primary_category', ''),
+        'authors_str': ", ".join(authors[:5]) + ("..." if len(authors) > 5 else ""),
+        'categories_str': ", ".join(paper.get('categories', [])),
+    }
 
 
 class AISummarizer:
     """Handles paper summarization using various AI providers"""
 
+    # Model used for each provider
+    MODELS = {
+        "gemini": "gemini-2.5-flash",
+        "openai": "gpt-4o-mini",
+        "claude": "claude-3-5-sonnet-20241022",
+        "grok": "grok-beta",
+    }
+
+    # Tool Claude is forced to call so its answer arrives as a JSON object
+    _CLAUDE_JSON_TOOL = {
+        "name": "submit_analysis",
+        "description": "Submit the analysis as a JSON object in the format requested by the prompt",
+        "input_schema": {"type": "object"},
+    }
+
     def __init__(self, provider: str = None):
         """
         Initialize AI summarizer
@@ -20,6 +163,19 @@ class AISummarizer:
         self.provider = provider or config.AI_PROVIDER
         self.client = None
         self._initialize_client()
+        self.model = self.MODELS[self.provider]
+
+        # Responses are cached on disk so reruns don't pay for the same prompt twice
+        self._cache = DiskCache(config.AI_CACHE_DIR) if config.ENABLE_AI_CACHE else None
+
+        # Single alternation over all health keywords, longest first, inside a
+        # lookahead so every start position is tried. The longest keyword found
+        # at a position stands in for the shorter keywords it starts with (e.g.
+        # "drug discovery" for "drug"), so each counts as that many hits; this
+        # counts every occurrence, overlaps included, in one pass.
+        keywords = sorted({k.lower() for k in config.HEALTH_KEYWORDS}, key=len, reverse=True)
+        self._keyword_re = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))")
+        self._keyword_hits = {k: sum(k.startswith(other) for other in keywords) for k in keywords}
 
     def _initialize_client(self):
         """Initialize the appropriate AI client based on provider"""
@@ -41,9 +197,28 @@ class AISummarizer:
 
         import google.generativeai as genai
         genai.configure(api_key=config.GEMINI_API_KEY)
-        self.client = genai.GenerativeModel('gemini-2.5-flash')
+        # Gemini takes the system prompt at model construction time, so keep
+        # one model object per system prompt
+        self._genai = genai
+        self._gemini_models = {}
         print(f"Initialized Gemini API client")
 
+    def _gemini_model(self, system: str):
+        """
+        Get the Gemini model configured with a system instruction
+
+        Args:
+            system: System prompt
+
+        Returns:
+            GenerativeModel instance
+        """
+        model = self._gemini_models.get(system)
+        if model is None:
+            model = self._genai.GenerativeModel(self.MODELS['gemini'], system_instruction=system)
+            self._gemini_models[system] = model
+        return model
+
     def _initialize_openai(self):
         """Initialize OpenAI client"""
         if not config.OPENAI_API_KEY:
@@ -75,42 +250,39 @@ class AISummarizer:
         )
         print(f"Initialized Grok API client")
 
-    def check_relevance(self, paper: Dict) -> Tuple[bool, float, str]:
+    def prefilter(self, paper: Dict) -> int:
         """
-        Check if paper is relevant to medicine/health using AI
+        Count health keyword hits in a paper's title and abstract
+
+        A cheap local check used to skip the AI relevance call for papers
+        that clearly have nothing to do with health.
 
         Args:
             paper: Paper dictionary with title and abstract
 
         Returns:
-            Tuple of (is_relevant, relevance_score, reasoning)
+            Number of keyword occurrences, counting keywords inside longer
+            ones (e.g. "medicine" in "precision medicine") separately
         """
-        prompt = f"""Analyze if this research paper is relevant to medicine, healthcare, health, biosecurity, or medical AI/applications.
-
-Title: {paper['title']}
-
-Abstract: {paper['abstract']}
+        text = f"{paper['title']} {paper['abstract']}".lower()
+        return sum(self._keyword_hits[m.group(1)] for m in self._keyword_re.finditer(text))
 
-Primary Category: {paper['primary_category']}
-Categories: {', '.join(paper['categories'])}
-
-Respond in JSON format:
-{{
-    "is_relevant": true/false,
-    "relevance_score": 0.0-1.0,
-    "reasoning": "brief explanation",
-    "medical_domains": ["list", "of", "relevant", "medical", "domains"],
-    "ai_health_application": "describe AI application to health if applicable"
-}}
+    def check_relevance(self, paper: Dict) -> Tuple[bool, float, str]:
+        """
+        Check if paper is relevant to medicine/health using AI
 
-Be strict: only mark as relevant if there's clear connection to medicine, health, biosecurity, or medical AI applications."""
+        Args:
+            paper: Paper dictionary with title and abstract
 
+        Returns:
+            Tuple of (is_relevant, relevance_score, reasoning)
+        """
         try:
-            response_text = self._call_ai(prompt)
+            prompt = _RELEVANCE_PROMPT.format_map(_prompt_fields(paper))
+            response_text = self._call_ai(prompt, SYSTEM_PROMPT_RELEVANCE)
             # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
+            result = _extract_json(response_text)
+            if result is not None:
                 return (
                     result.get('is_relevant', False),
                     result.get('relevance_score', 0.0),
@@ -136,41 +308,12 @@ Be strict: only mark as relevant if there's clear connection to medicine, health
         Returns:
             Dictionary with summary, bullet points, keywords, etc.
         """
-        prompt = f"""Analyze and summarize this medical/health research paper in detail.
-
-Title: {paper['title']}
-
-Authors: {', '.join(paper['authors'][:5])}{'...' if len(paper['authors']) > 5 else ''}
-
-Abstract: {paper['abstract']}
-
-Primary Category: {paper['primary_category']}
-All Categories: {', '.join(paper['categories'])}
-
-Provide a comprehensive analysis in JSON format:
-{{
-    "summary": "2-3 sentence overview of the paper's main contribution and findings",
-    "key_points": [
-        "5-7 specific bullet points covering methodology, results, and implications"
-    ],
-    "medical_relevance": "Why this matters for medicine/health (1-2 sentences)",
-    "keywords": ["list", "of", "5-8", "relevant", "keywords"],
-    "medical_domains": ["specific", "medical", "fields"],
-    "methodology": "Brief description of methods used",
-    "key_findings": "Main results or discoveries",
-    "clinical_impact": "Potential clinical or practical impact",
-    "limitations": "Any noted limitations or caveats",
-    "future_directions": "Suggested future research directions if mentioned"
-}}
-
-Be specific, technical, and focus on practical medical/health implications."""
-
         try:
-            response_text = self._call_ai(prompt)
+            prompt = _PAPER_PROMPT.format_map(_prompt_fields(paper))
+            response_text = self._call_ai(prompt, SYSTEM_PROMPT_SUMMARY)
             # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                summary = json.loads(json_match.group())
+            summary = _extract_json(response_text)
+            if summary is not None:
                 return summary
             else:
                 print(f"Warning: Could not parse summary as JSON")
@@ -180,41 +323,136 @@ Be specific, technical, and focus on practical medical/health implications."""
             print(f"Error generating summary: {e}")
             return self._generate_fallback_summary(paper)
 
-    def _call_ai(self, prompt: str) -> str:
+    def analyze_paper(self, paper: Dict) -> Tuple[Tuple, Optional[Dict]]:
         """
-        Call the configured AI provider with a prompt
+        Check relevance and summarize a paper with a single AI call
 
         Args:
-            prompt: The prompt to send
+            paper: Paper dictionary with title, abstract, etc.
+
+        Returns:
+            Tuple of (relevance, summary) where relevance has the same shape
+            as check_relevance() and summary is None for irrelevant papers
+        """
+        try:
+            prompt = _PAPER_PROMPT.format_map(_prompt_fields(paper))
+            response_text = self._call_ai(prompt, SYSTEM_PROMPT_ANALYSIS)
+            result = _extract_json(response_text)
+            if result is None:
+                print(f"Warning: Could not parse AI response as JSON")
+                return (False, 0.0, "Failed to parse response", [], ""), None
+
+            relevance_data = result.get('relevance') or {}
+            relevance = (
+                relevance_data.get('is_relevant', False),
+                relevance_data.get('relevance_score', 0.0),
+                relevance_data.get('reasoning', ''),
+                relevance_data.get('medical_domains', []),
+                relevance_data.get('ai_health_application', '')
+            )
+
+            if not relevance[0]:
+                return relevance, None
+
+            summary = result.get('summary')
+            if not isinstance(summary, dict):
+                # Model flagged the paper as relevant but skipped the summary
+                summary = self.summarize_paper(paper)
+            return relevance, summary
+
+        except Exception as e:
+            print(f"Error analyzing paper: {e}")
+            return (False, 0.0, f"Error: {e}", [], ""), None
+
+    def _call_ai(self, prompt: str, system: str) -> str:
+        """
+        Call the configured AI provider with a prompt, using the disk cache
+
+        Args:
+            prompt: The paper-specific user prompt
+            system: System prompt with the task instructions and schema
 
         Returns:
             AI response text
         """
+        if self._cache is None:
+            return self._request_ai(prompt, system)
+
+        key = DiskCache.make_key(self.provider, self.model, system, prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        response_text = self._request_ai(prompt, system)
+        # Only keep replies the callers can parse, so a truncated or malformed
+        # one is retried next run instead of being replayed forever
+        if response_text and _extract_json(response_text) is not None:
+            self._cache.set(key, response_text)
+        return response_text
+
+    def _request_ai(self, prompt: str, system: str) -> str:
+        """
+        Send a prompt to the configured AI provider
+
+        Args:
+            prompt: The paper-specific user prompt
+            system: System prompt with the task instructions and schema
+
+        Returns:
+            AI response text
+        """
+        # Every prompt asks for a JSON object, so request JSON mode from the
+        # provider instead of relying on the model to format free text
         if self.provider == "gemini":
-            response = self.client.generate_content(prompt)
+            response = self._gemini_model(system).generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
             return response.text
 
         elif self.provider == "openai":
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                response_format={"type": "json_object"}
             )
             return response.choices[0].message.content
 
         elif self.provider == "claude":
+            # Claude has no JSON mode; forcing a tool call makes it return
+            # the object as parsed tool input
             response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+                model=self.model,
                 max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
+                # The system prompt is the same for every paper in a run, so
+                # mark it (and the tool definition before it) as cacheable
+                system=[{
+                    "type": "text",
+                    "text": system,
+                    "cache_control": {"type": "ephemeral"}
+                }],
+                messages=[{"role": "user", "content": prompt}],
+                tools=[self._CLAUDE_JSON_TOOL],
+                tool_choice={"type": "tool", "name": self._CLAUDE_JSON_TOOL["name"]}
             )
+            for block in response.content:
+                if block.type == "tool_use":
+                    return json.dumps(block.input)
             return response.content[0].text
 
         elif self.provider == "grok":
             response = self.client.chat.completions.create(
-                model="grok-beta",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                response_format={"type": "json_object"}
             )
             return response.choices[0].message.content
 
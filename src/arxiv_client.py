@@ -2,10 +2,19 @@
 arXiv API client for fetching medical and health-related papers
 """
 import arxiv
-import time
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict, Iterator, List
 import config
+from src.utils import RateLimiter
+
+# Read PDF responses in 64KB chunks instead of buffering whole files
+PDF_CHUNK_SIZE = 64 * 1024
+
+# Concurrent PDF downloads; also the size of the session's connection pool
+DOWNLOAD_WORKERS = 4
 
 
 class ArxivHealthClient:
@@ -13,56 +22,42 @@ class ArxivHealthClient:
 
     def __init__(self):
         self.client = arxiv.Client()
-        self.keywords = config.HEALTH_KEYWORDS
-        self.categories = config.ARXIV_CATEGORIES
+        # One keep-alive connection per download worker, reused for the
+        # whole run instead of reconnecting for every PDF
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=DOWNLOAD_WORKERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # arXiv asks for no more than one request every few seconds
+        self._download_limiter = RateLimiter(1, config.ARXIV_REQUEST_INTERVAL)
 
     def build_search_query(self, days_back: int = None) -> str:
         """
         Build arXiv search query for medical/health papers
 
         Args:
-            days_back: Number of days to look back for papers
+            days_back: Number of days to look back for papers (not part of
+                the query; kept for API compatibility)
 
         Returns:
             Query string for arXiv API
         """
-        if days_back is None:
-            days_back = config.DAYS_TO_LOOK_BACK
-
-        # Build keyword search (title or abstract contains health keywords)
-        keyword_queries = []
-        for keyword in self.keywords[:30]:  # Limit to avoid query length issues
-            keyword_queries.append(f'ti:"{keyword}" OR abs:"{keyword}"')
-
-        keyword_query = " OR ".join(keyword_queries)
-
-        # Add category filters
-        category_queries = []
-        for cat in self.categories:
-            if "*" in cat:
-                # For wildcard categories, just use the base
-                base_cat = cat.replace(".*", "")
-                category_queries.append(f'cat:{base_cat}.*')
-            else:
-                category_queries.append(f'cat:{cat}')
+        # The query only depends on static config, so it is precomputed there
+        return f"({config.HEALTH_KEYWORD_QUERY}) AND ({config.ARXIV_CATEGORY_QUERY})"
 
-        category_query = " OR ".join(category_queries)
-
-        # Combine queries
-        full_query = f"({keyword_query}) AND ({category_query})"
-
-        return full_query
-
-    def fetch_recent_papers(self, max_results: int = None, days_back: int = None) -> List[Dict]:
+    def fetch_recent_papers(self, max_results: int = None, days_back: int = None) -> Iterator[Dict]:
         """
         Fetch recent health-related papers from arXiv
 
+        Papers are yielded as the API pages them in, so callers can start
+        processing before the whole result set has been downloaded.
+
         Args:
             max_results: Maximum number of papers to fetch
             days_back: Number of days to look back
 
-        Returns:
-            List of paper dictionaries
+        Yields:
+            Paper dictionaries
         """
         if max_results is None:
             max_results = config.MAX_RESULTS_PER_RUN
@@ -78,18 +73,18 @@ class ArxivHealthClient:
             sort_order=arxiv.SortOrder.Descending
         )
 
-        papers = []
+        count = 0
         try:
             for result in self.client.results(search):
                 paper = self._parse_arxiv_result(result)
-                papers.append(paper)
+                count += 1
                 print(f"  Found: {paper['title'][:80]}... ({paper['arxiv_id']})")
+                yield paper
 
         except Exception as e:
             print(f"Error fetching papers: {e}")
 
-        print(f"\nFetched {len(papers)} papers from arXiv")
-        return papers
+        print(f"\nFetched {count} papers from arXiv")
 
     def _parse_arxiv_result(self, result) -> Dict:
         """
@@ -138,15 +133,45 @@ class ArxivHealthClient:
             print(f"  PDF already exists: {pdf_path.name}")
             return str(pdf_path)
 
+        # Stream into a temporary file and rename once complete, so an
+        # interrupted download never leaves a truncated PDF behind that the
+        # existence check above would treat as done
+        tmp_path = pdf_path.with_name(pdf_path.name + ".part")
         try:
-            # Use arxiv library to download
-            search = arxiv.Search(id_list=[arxiv_id])
-            result = next(self.client.results(search))
-            result.download_pdf(filename=str(pdf_path))
+            self._download_limiter.wait()
+            with self.session.get(paper['pdf_url'], stream=True, timeout=60) as response:
+                response.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=PDF_CHUNK_SIZE):
+                        f.write(chunk)
+            tmp_path.replace(pdf_path)
             print(f"  Downloaded PDF: {pdf_path.name}")
-            time.sleep(1)  # Be nice to arXiv servers
             return str(pdf_path)
 
         except Exception as e:
             print(f"  Error downloading PDF for {arxiv_id}: {e}")
+            tmp_path.unlink(missing_ok=True)
             return None
+
+    def download_pdfs(self, papers: List[Dict], output_dir: str = None,
+                      max_workers: int = DOWNLOAD_WORKERS) -> Dict[str, str]:
+        """
+        Download PDFs for several papers concurrently
+
+        Requests are still paced by the shared arXiv rate limiter; running
+        them from a pool just overlaps the transfer time of each download.
+
+        Args:
+            papers: Paper dictionaries with pdf_url
+            output_dir: Directory to save PDFs
+            max_workers: Maximum number of concurrent downloads
+
+        Returns:
+            Dictionary mapping arxiv_id to downloaded PDF path (None on failure)
+        """
+        if not papers:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            paths = executor.map(lambda paper: self.download_pdf(paper, output_dir), papers)
+            return {paper['arxiv_id']: path for paper, path in zip(papers, paths)}
@@ -0,0 +1,496 @@
+// Health AI Hub - Professional Research Tool
+// Advanced Search, Filtering, Citation Export
+
+(function() {
+    'use strict';
+
+    // Listeners below are document/window-wide; never wire them twice
+    if (window.healthAiHubLoaded) return;
+    window.healthAiHubLoaded = true;
+
+    // ============================================
+    // BOOKMARKS
+    // ============================================
+    class BookmarkManager {
+        constructor() {
+            this.bookmarks = this.load();
+            this.countEl = document.getElementById('bookmark-count');
+            this.init();
+        }
+
+        load() {
+            const saved = localStorage.getItem('bookmarks');
+            return new Set(saved ? JSON.parse(saved) : []);
+        }
+
+        save() {
+            localStorage.setItem('bookmarks', JSON.stringify([...this.bookmarks]));
+            this.updateCount();
+        }
+
+        add(paperId) {
+            if (!this.bookmarks.has(paperId)) {
+                this.bookmarks.add(paperId);
+                this.save();
+                return true;
+            }
+            return false;
+        }
+
+        remove(paperId) {
+            if (this.bookmarks.delete(paperId)) {
+                this.save();
+                return true;
+            }
+            return false;
+        }
+
+        has(paperId) {
+            return this.bookmarks.has(paperId);
+        }
+
+        toggle(paperId) {
+            if (this.has(paperId)) {
+                this.remove(paperId);
+                return false;
+            } else {
+                this.add(paperId);
+                return true;
+            }
+        }
+
+        updateCount() {
+            if (this.countEl) {
+                this.countEl.textContent = this.bookmarks.size;
+            }
+        }
+
+        init() {
+            this.updateCount();
+
+            // Update all bookmark buttons, and tag bookmarked cards for the CSS filter
+            document.querySelectorAll('.bookmark-btn').forEach(btn => {
+                if (this.has(btn.getAttribute('data-paper-id'))) {
+                    btn.classList.add('bookmarked');
+                }
+            });
+            document.querySelectorAll('.paper-card').forEach(card => {
+                if (this.has(card.dataset.arxivId)) {
+                    card.dataset.bookmarked = 'true';
+                }
+            });
+
+            // One delegated listener handles every bookmark button
+            document.addEventListener('click', (e) => {
+                const btn = e.target.closest('.bookmark-btn');
+                if (!btn) return;
+                const isBookmarked = this.toggle(btn.getAttribute('data-paper-id'));
+                btn.classList.toggle('bookmarked', isBookmarked);
+                const card = btn.closest('.paper-card');
+                if (card) card.dataset.bookmarked = String(isBookmarked);
+            });
+
+            // Show bookmarks button
+            const showBookmarksBtn = document.getElementById('show-bookmarks');
+            if (showBookmarksBtn) {
+                showBookmarksBtn.addEventListener('click', () => {
+                    this.filterBookmarked();
+                });
+            }
+        }
+
+        filterBookmarked() {
+            // Hiding is left to CSS: one class on the container, one style pass
+            const container = document.getElementById('papers-container');
+            if (!container) return;
+            const bookmarksOnly = container.classList.toggle('bookmarks-only');
+
+            if (bookmarksOnly && this.bookmarks.size === 0) {
+                alert('No bookmarks yet! Click the 🔖 button on papers to save them.');
+            }
+        }
+    }
+
+    const bookmarkManager = new BookmarkManager();
+
+    // ============================================
+    // ADVANCED SEARCH & FILTERS
+    // ============================================
+    const searchInput = document.getElementById('search');
+    const sortSelect = document.getElementById('sort-select');
+    const domainFilter = document.getElementById('domain-filter');
+    const authorFilter = document.getElementById('author-filter');
+    const papersContainer = document.getElementById('papers-container');
+    const SEARCH_DEBOUNCE_MS = 200;
+
+    // Run fn once input has been idle for `delay` ms
+    function debounce(fn, delay) {
+        let timer;
+        return (...args) => {
+            clearTimeout(timer);
+            timer = setTimeout(() => fn(...args), delay);
+        };
+    }
+
+    if (papersContainer) {
+        const papers = Array.from(papersContainer.querySelectorAll('.paper-card'));
+
+        // Trigram Bloom mask: a word can only start one of a card's words if
+        // every one of its trigram bits is set in the card's mask
+        const BLOOM_WORDS = 32;  // 1024 bits; 64 saturates on summary-length text
+
+        // Same word characters as the build's tokenizer and the search worker
+        const WORD_RE = /[\p{L}\p{N}_]+/gu;
+
+        function trigramMask(text, mask = new Uint32Array(BLOOM_WORDS)) {
+            for (let i = 0; i + 3 <= text.length; i++) {
+                let h = Math.imul(text.charCodeAt(i), 0x9e3779b1);
+                h = Math.imul(h ^ text.charCodeAt(i + 1), 0x85ebca6b);
+                h = Math.imul(h ^ text.charCodeAt(i + 2), 0xc2b2ae35);
+                h = (h ^ (h >>> 15)) & (BLOOM_WORDS * 32 - 1);
+                mask[h >>> 5] |= 1 << (h & 31);
+            }
+            return mask;
+        }
+
+        function maskContains(cardMask, termMask) {
+            for (let i = 0; i < BLOOM_WORDS; i++) {
+                if (termMask[i] & ~cardMask[i]) return false;
+            }
+            return true;
+        }
+
+        // First word >= prefix in a sorted word list
+        function lowerBound(words, prefix) {
+            let lo = 0;
+            let hi = words.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >>> 1;
+                if (words[mid] < prefix) lo = mid + 1;
+                else hi = mid;
+            }
+            return lo;
+        }
+
+        function hasPrefix(words, prefix) {
+            const i = lowerBound(words, prefix);
+            return i < words.length && words[i].startsWith(prefix);
+        }
+
+        // Cards are static, so build a flat search/sort index once and
+        // keep the keystroke path away from the DOM entirely
+        const index = papers.map(el => {
+            const titleLower = (el.querySelector('.paper-title a')?.textContent || '').toLowerCase();
+            const record = {
+                el,
+                domainsLower: (el.dataset.domains || '').toLowerCase(),
+                authorsLower: (el.dataset.authors || '').toLowerCase(),
+                dateKey: el.querySelector('.date')?.textContent || '',
+                // Parsed to numbers here so comparators are plain subtraction
+                relKey: parseFloat(el.querySelector('.relevance')?.textContent.split(' ')[1]) || 0,
+                citKey: parseInt(el.querySelector('.citations')?.textContent.match(/\d+/)?.[0], 10) || 0,
+                titleKey: titleLower
+            };
+            const text = [
+                titleLower,
+                (el.querySelector('.paper-summary')?.textContent || '').toLowerCase(),
+                (el.dataset.keywords || '').toLowerCase(),
+                record.domainsLower, record.authorsLower
+            ].join('\n');
+            // Sorted unique words, so each query word is one binary search
+            record.words = [...new Set(text.match(WORD_RE))].sort();
+            record.bloom = trigramMask(text);
+            return record;
+        });
+
+        // Comparators over index records, keyed by sort-select value
+        // Dates are YYYY-MM-DD, so a raw string compare orders them; titles
+        // compare lowercased, code unit by code unit, like the search worker
+        const compareBy = {
+            date: (a, b) => (a.dateKey < b.dateKey ? 1 : a.dateKey > b.dateKey ? -1 : 0),
+            relevance: (a, b) => b.relKey - a.relKey,
+            citations: (a, b) => b.citKey - a.citKey,
+            title: (a, b) => (a.titleKey < b.titleKey ? -1 : a.titleKey > b.titleKey ? 1 : 0)
+        };
+
+        // Filter and sort on a worker when one can load the search index;
+        // the in-page index above stays as the fallback (e.g. file:// views)
+        const cardsById = new Map(papers.map(el => [el.dataset.arxivId, el]));
+        let searchWorker = null;
+        let workerReady = false;
+        let querySeq = 0;
+
+        if (window.Worker) {
+            try {
+                searchWorker = new Worker('search-worker.js');
+                searchWorker.onmessage = (e) => {
+                    const msg = e.data;
+                    if (msg.type === 'ready') {
+                        workerReady = true;
+                    } else if (msg.type === 'result' && msg.seq === querySeq) {
+                        showCards(msg.ids.map(id => cardsById.get(id)).filter(Boolean));
+                    } else if (msg.type === 'error') {
+                        searchWorker = null;
+                        workerReady = false;
+                    }
+                };
+                searchWorker.onerror = () => {
+                    searchWorker = null;
+                    workerReady = false;
+                };
+                searchWorker.postMessage({
+                    type: 'init', url: 'search-index.json', postingsUrl: 'search-postings.json'
+                });
+            } catch (err) {
+                searchWorker = null;
+            }
+        }
+
+        function filterAndSort() {
+            const searchTerm = searchInput ? searchInput.value.toLowerCase() : '';
+            const selectedDomain = domainFilter ? domainFilter.value.toLowerCase() : '';
+            const authorTerm = authorFilter ? authorFilter.value.toLowerCase() : '';
+            const sortBy = sortSelect ? sortSelect.value : 'date';
+
+            if (searchWorker && workerReady) {
+                searchWorker.postMessage({
+                    type: 'query', seq: ++querySeq,
+                    q: searchTerm, domain: selectedDomain, author: authorTerm, sort: sortBy
+                });
+                return;
+            }
+
+            // Search matches cards with a word starting with every query word,
+            // the same rule the search worker applies
+            const words = searchTerm.match(WORD_RE);
+            const termMask = words ? new Uint32Array(BLOOM_WORDS) : null;
+            if (words) words.forEach(word => trigramMask(word, termMask));
+
+            // Filter papers, cheapest predicates first
+            const matched = index.filter(r => {
+                // Domain and author filters check a single field each
+                if (selectedDomain && !r.domainsLower.includes(selectedDomain)) return false;
+                if (authorTerm && !r.authorsLower.includes(authorTerm)) return false;
+                if (!words) return true;
+
+                // Search filter (title, summary, keywords, domains, authors); the
+                // Bloom mask rules out most non-matching cards before any lookup
+                if (termMask && !maskContains(r.bloom, termMask)) return false;
+                return words.every(word => hasPrefix(r.words, word));
+            });
+
+            // Sort papers
+            matched.sort(compareBy[sortBy] || compareBy.date);
+
+            showCards(matched.map(r => r.el));
+        }
+
+        // Every card in its current DOM order
+        let domOrder = papers.slice();
+
+        function showCards(cards) {
+            // Only write to cards whose visibility actually changes
+            const next = new Set(cards);
+            papers.forEach(card => {
+                const show = next.has(card);
+                if (card.classList.contains('hidden') === show) {
+                    card.classList.toggle('hidden', !show);
+                }
+            });
+
+            // Move nodes only when the requested order differs from the DOM's
+            const position = new Map(domOrder.map((card, i) => [card, i]));
+            const inOrder = cards.every((card, i) => i === 0 || position.get(cards[i - 1]) < position.get(card));
+            if (!inOrder) {
+                const fragment = document.createDocumentFragment();
+                cards.forEach(card => fragment.appendChild(card));
+                papersContainer.appendChild(fragment);
+                domOrder = domOrder.filter(card => !next.has(card)).concat(cards);
+            }
+
+            // Show/hide no results message
+            updateNoResults(cards.length === 0);
+        }
+
+        function updateNoResults(show) {
+            let noResults = document.getElementById('no-results');
+            if (show && !noResults) {
+                noResults = document.createElement('div');
+                noResults.id = 'no-results';
+                noResults.className = 'no-results';
+                noResults.innerHTML = `
+                    <h3>No papers found</h3>
+                    <p>Try adjusting your search criteria or filters.</p>
+                `;
+                papersContainer.appendChild(noResults);
+            } else if (!show && noResults) {
+                noResults.remove();
+            }
+        }
+
+        // Attach event listeners; typing is debounced, select changes apply at once
+        const debouncedFilter = debounce(filterAndSort, SEARCH_DEBOUNCE_MS);
+        if (searchInput) searchInput.addEventListener('input', debouncedFilter);
+        if (sortSelect) sortSelect.addEventListener('change', filterAndSort);
+        if (domainFilter) domainFilter.addEventListener('change', filterAndSort);
+        if (authorFilter) authorFilter.addEventListener('input', debouncedFilter);
+    }
+
+    // ============================================
+    // SOCIAL SHARING
+    // ============================================
+    document.addEventListener('click', (e) => {
+        const btn = e.target.closest('.share-btn');
+        if (!btn) return;
+        e.preventDefault();
+        // Templates precompute the share link; build it here only if missing
+        const shareUrl = btn.dataset.shareUrl || buildShareUrl(btn);
+        window.open(shareUrl, '_blank', 'width=600,height=400');
+    });
+
+    function buildShareUrl(btn) {
+        // The card carries both the id and the title the share text needs
+        const card = btn.closest('.paper-card');
+        const paperId = card?.dataset.arxivId || btn.dataset.paperId;
+        const title = card?.querySelector('.paper-title a')?.textContent || '';
+        const url = `https://arxiv-health.org/papers/${paperId.replace('/', '_')}.html`;
+
+        return `https://twitter.com/intent/tweet?text=${encodeURIComponent(title)}&url=${encodeURIComponent(url)}&via=ArXiv_Health&hashtags=HealthAI,MedicalAI,Research`;
+    }
+
+    // ============================================
+    // CITATION EXPORT
+    // ============================================
+    const exportModal = document.getElementById('export-modal');
+    const citationOutput = document.getElementById('citation-output');
+    let currentPaperId = null;
+
+    // Export button click
+    document.addEventListener('click', (e) => {
+        const btn = e.target.closest('.export-btn');
+        if (!btn) return;
+        e.preventDefault();
+        currentPaperId = btn.getAttribute('data-paper-id');
+        if (exportModal) {
+            exportModal.style.display = 'block';
+        }
+    });
+
+    // Format selection, and closing on a click outside the modal content
+    if (exportModal) {
+        exportModal.addEventListener('click', (e) => {
+            if (e.target === exportModal) {
+                exportModal.style.display = 'none';
+                return;
+            }
+            const btn = e.target.closest('.export-format');
+            if (!btn || !currentPaperId || !citationOutput) return;
+
+            // Fallback: generate simple citation
+            citationOutput.value = generateFallbackCitation(currentPaperId, btn.getAttribute('data-format'));
+        });
+    }
+
+    // Copy to clipboard
+    const copyCitationBtn = document.getElementById('copy-citation');
+    let copyResetTimer = null;
+    if (copyCitationBtn) {
+        copyCitationBtn.addEventListener('click', () => {
+            if (citationOutput) {
+                citationOutput.select();
+                document.execCommand('copy');
+                copyCitationBtn.textContent = 'Copied!';
+                // Rapid clicks restart one timer rather than stacking several
+                clearTimeout(copyResetTimer);
+                copyResetTimer = setTimeout(() => {
+                    copyCitationBtn.textContent = 'Copy to Clipboard';
+                }, 2000);
+            }
+        });
+    }
+
+    // Close modal
+    const modalClose = document.querySelector('.modal-close');
+    if (modalClose) {
+        modalClose.addEventListener('click', () => {
+            if (exportModal) {
+                exportModal.style.display = 'none';
+            }
+        });
+    }
+
+    function generateFallbackCitation(paperId, format) {
+        // Simple fallback citation generation
+        const paperCard = document.querySelector(`[data-arxiv-id="${paperId}"]`);
+        if (!paperCard) return '';
+
+        const title = paperCard.querySelector('.paper-title')?.textContent || '';
+        const authors = paperCard.dataset.authors || '';
+        const date = paperCard.querySelector('.date')?.textContent.replace('📅 ', '') || '';
+
+        if (format === 'bibtex') {
+            return `@article{${paperId.replace('/', '_')},
+  title={${title}},
+  author={${authors.split(',')[0]}},
+  year={${date.substring(0, 4)}},
+  url={https://arxiv.org/abs/${paperId}}
+}`;
+        } else if (format === 'ris') {
+            return `TY  - JOUR
+TI  - ${title}
+AU  - ${authors.split(',')[0]}
+PY  - ${date.substring(0, 4)}
+UR  - https://arxiv.org/abs/${paperId}
+ER  -`;
+        }
+        return `${title}\n${authors}\n${date}\nhttps://arxiv.org/abs/${paperId}`;
+    }
+
+    // ============================================
+    // SMOOTH SCROLLING
+    // ============================================
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({ behavior: 'smooth' });
+            }
+        });
+    });
+
+    // ============================================
+    // ANALYTICS (Page views tracking)
+    // ============================================
+    function trackView() {
+        // Simple view tracking - can integrate with Google Analytics later
+        const viewed = new Set(JSON.parse(sessionStorage.getItem('papers_viewed') || '[]'));
+
+        // One observer for every card; storage is written once per batch
+        const observer = new IntersectionObserver((entries) => {
+            let changed = false;
+            for (const entry of entries) {
+                if (!entry.isIntersecting) continue;
+                const paperId = entry.target.getAttribute('data-arxiv-id');
+                observer.unobserve(entry.target);
+                if (!viewed.has(paperId)) {
+                    viewed.add(paperId);
+                    changed = true;
+                }
+            }
+            if (changed) {
+                sessionStorage.setItem('papers_viewed', JSON.stringify([...viewed]));
+            }
+        }, { threshold: 0.5 });
+
+        document.querySelectorAll('.paper-card').forEach(card => {
+            if (!viewed.has(card.getAttribute('data-arxiv-id'))) {
+                observer.observe(card);
+            }
+        });
+    }
+
+    trackView();
+
+    console.log('🔬 Health AI Hub - Enhanced Features Loaded');
+})();
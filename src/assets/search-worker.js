@@ -0,0 +1,121 @@
+// Health AI Hub - Search worker
+// Filters and sorts search-index.json off the main thread and replies
+// with the matching paper ids in display order. Text search matches papers
+// with a word starting with every word of the query, the same rule as the
+// in-page fallback in script.js. When the prebuilt search-postings.json is
+// available, its posting lists and presorted orders are used instead of
+// each record's own word list.
+'use strict';
+
+let records = [];
+let index = null;  // { tokens, postings, order } from search-postings.json
+
+// Dates are YYYY-MM-DD, so a raw string compare orders them; titles
+// compare lowercased, code unit by code unit, matching the build's
+// presorted title order
+const compareBy = {
+    date: (a, b) => (a.dateKey < b.dateKey ? 1 : a.dateKey > b.dateKey ? -1 : 0),
+    relevance: (a, b) => b.relKey - a.relKey,
+    citations: (a, b) => b.citKey - a.citKey,
+    title: (a, b) => (a.titleKey < b.titleKey ? -1 : a.titleKey > b.titleKey ? 1 : 0)
+};
+
+function buildRecords(entries) {
+    return entries.map((entry, row) => ({
+        id: entry.id,
+        row,
+        // Sorted so prefix lookups can binary search, as over index.tokens
+        words: (entry.terms || []).slice().sort(),
+        domainsLower: (entry.domains || []).join(',').toLowerCase(),
+        authorsLower: (entry.authors || []).join(',').toLowerCase(),
+        dateKey: entry.published || '',
+        relKey: entry.relevance || 0,
+        citKey: entry.citations || 0,
+        titleKey: (entry.title || '').toLowerCase()
+    }));
+}
+
+// First token >= prefix in a sorted token list
+function lowerBound(tokens, prefix) {
+    let lo = 0;
+    let hi = tokens.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (tokens[mid] < prefix) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo;
+}
+
+function hasPrefix(tokens, prefix) {
+    const i = lowerBound(tokens, prefix);
+    return i < tokens.length && tokens[i].startsWith(prefix);
+}
+
+// Rows containing a token starting with every word in words
+function matchWords(words) {
+    const { tokens, postings } = index;
+    let hits = null;
+    for (const word of words) {
+        const seen = new Uint8Array(records.length);
+        for (let i = lowerBound(tokens, word); i < tokens.length && tokens[i].startsWith(word); i++) {
+            for (const row of postings[i]) seen[row] = 1;
+        }
+        if (hits) {
+            for (let row = 0; row < hits.length; row++) hits[row] &= seen[row];
+        } else {
+            hits = seen;
+        }
+    }
+    return hits;
+}
+
+function query({ q, domain, author, sort }) {
+    // A query without word characters has nothing to match on, like an empty one
+    const words = (q && q.match(/[\p{L}\p{N}_]+/gu)) || null;
+    const hits = words && index ? matchWords(words) : null;
+
+    // Single-field filters first so most rejects skip the text search
+    const keep = r => {
+        if (domain && !r.domainsLower.includes(domain)) return false;
+        if (author && !r.authorsLower.includes(author)) return false;
+        if (!words) return true;
+        if (hits) return hits[r.row] === 1;
+        return words.every(word => hasPrefix(r.words, word));
+    };
+
+    if (index) {
+        const order = index.order[sort] || index.order.date;
+        const ids = [];
+        for (const row of order) {
+            if (keep(records[row])) ids.push(records[row].id);
+        }
+        return ids;
+    }
+
+    const matched = records.filter(keep);
+    matched.sort(compareBy[sort] || compareBy.date);
+    return matched.map(r => r.id);
+}
+
+self.onmessage = async (e) => {
+    const msg = e.data;
+    if (msg.type === 'init') {
+        try {
+            const [response, postingsResponse] = await Promise.all([
+                fetch(msg.url),
+                msg.postingsUrl ? fetch(msg.postingsUrl).catch(() => null) : null
+            ]);
+            records = buildRecords(await response.json());
+            // Optional: without it, each query scans the records' word lists
+            if (postingsResponse && postingsResponse.ok) {
+                index = await postingsResponse.json().catch(() => null);
+            }
+            self.postMessage({ type: 'ready' });
+        } catch (err) {
+            self.postMessage({ type: 'error', message: String(err) });
+        }
+    } else if (msg.type === 'query') {
+        self.postMessage({ type: 'result', seq: msg.seq, ids: query(msg) });
+    }
+};
@@ -1,16 +1,87 @@
 """
 Database management for tracking processed papers
 """
-from tinydb import TinyDB, Query
-from datetime import datetime
-from typing import Dict, List, Optional
+import json
 import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 import config
+from src.enhancements import PaperEnhancements
+from src.utils import parse_published
+
+
+# get_all_papers sort keys mapped to indexed columns
+SORT_COLUMNS = {
+    'published': 'published',
+    'relevance_score': 'relevance_score',
+    'added_to_db': 'added_at',
+    'trending_score': 'trending_score',
+}
+
+
+def _encode(record: Dict) -> str:
+    """Serialize a record compactly for the data column"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+def _decode(data: str) -> Dict:
+    """
+    Deserialize a paper record from the data column
+
+    Domain names are interned so the handful of distinct values are shared
+    across every loaded paper and counting them hashes by identity.
+    """
+    record = json.loads(data)
+    domains = record.get('medical_domains')
+    if domains:
+        record['medical_domains'] = [sys.intern(d) for d in domains]
+    return record
+
+
+@lru_cache(maxsize=256)
+def _search_pattern(query: str) -> re.Pattern:
+    """Compile (and remember) the case-insensitive pattern for a search query"""
+    return re.compile(query, re.IGNORECASE)
+
+
+# Text indexed for full-text search, built from a papers.data value: title,
+# abstract and keywords aggregated into a single column
+_FTS_CONTENT_SQL = """
+    COALESCE(json_extract({data}, '$.title'), '') || ' ' ||
+    COALESCE(json_extract({data}, '$.abstract'), '') || ' ' ||
+    COALESCE((SELECT group_concat(value, ' ') FROM json_each({data}, '$.keywords')), '')
+"""
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 phrase query that also matches word prefixes"""
+    return '"' + query.replace('"', '""') + '"*'
+
+
+def _row(record: Dict) -> tuple:
+    """Build the papers row for a record"""
+    return (
+        record['arxiv_id'],
+        record.get('published', ''),
+        record.get('relevance_score', 0.0),
+        record.get('added_to_db', ''),
+        record.get('trending_score', 0.0),
+        _encode(record),
+    )
 
 
 class PaperDatabase:
     """Manages storage and retrieval of processed papers"""
 
+    _INSERT_SQL = """
+        INSERT OR IGNORE INTO papers (arxiv_id, published, relevance_score, added_at, trending_score, data)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+
     def __init__(self, db_path: str = None):
         """
         Initialize database
@@ -21,11 +92,193 @@ class PaperDatabase:
         if db_path is None:
             db_path = config.DATABASE_PATH
 
-        self.db = TinyDB(str(db_path), indent=2, sort_keys=True)
-        self.papers = self.db.table('papers')
-        self.metadata = self.db.table('metadata')
+        # Callers may share one instance between worker threads as long as
+        # they serialize access themselves (see run.py)
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent with NORMAL sync; only the last
+        # commits before a power loss can be lost
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._fts = self._create_fts()
+        self._migrate_legacy_json(config.LEGACY_DATABASE_PATH)
+
+        # In-memory index of stored IDs so existence checks never hit the database
+        self._known_ids = set()
+        self.invalidate()
         print(f"Database initialized at: {db_path}")
 
+    def _create_schema(self):
+        """Create tables if they don't exist yet"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    arxiv_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    added_at TEXT NOT NULL
+                )
+            """)
+
+            # Sort columns, added to databases created before they existed
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(papers)")}
+            if 'published' not in columns:
+                self.conn.execute("ALTER TABLE papers ADD COLUMN published TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("UPDATE papers SET published = COALESCE(json_extract(data, '$.published'), '')")
+            if 'relevance_score' not in columns:
+                self.conn.execute("ALTER TABLE papers ADD COLUMN relevance_score REAL NOT NULL DEFAULT 0")
+                self.conn.execute("UPDATE papers SET relevance_score = COALESCE(json_extract(data, '$.relevance_score'), 0)")
+
+            if 'trending_score' not in columns:
+                self.conn.execute("ALTER TABLE papers ADD COLUMN trending_score REAL NOT NULL DEFAULT 0")
+
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_published ON papers(published DESC)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_relevance ON papers(relevance_score DESC)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_added ON papers(added_at DESC)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_trending ON papers(trending_score DESC)")
+            # One row per (paper, medical domain), kept in sync by triggers so
+            # domain statistics can be aggregated in SQL
+            has_domains = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_domains'"
+            ).fetchone()
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS paper_domains (
+                    arxiv_id TEXT NOT NULL,
+                    domain TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_domains_domain ON paper_domains(domain)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_paper_domains_paper ON paper_domains(arxiv_id)")
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS papers_domains_insert AFTER INSERT ON papers BEGIN
+                    INSERT INTO paper_domains (arxiv_id, domain)
+                    SELECT new.arxiv_id, value FROM json_each(new.data, '$.medical_domains');
+                END
+            """)
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS papers_domains_delete AFTER DELETE ON papers BEGIN
+                    DELETE FROM paper_domains WHERE arxiv_id = old.arxiv_id;
+                END
+            """)
+            # Rewriting a record's domains rebuilds its rows and, since the
+            # domain counts come from them, drops the cached statistics
+            self.conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS papers_domains_update AFTER UPDATE OF data ON papers
+                WHEN json_extract(old.data, '$.medical_domains') IS NOT json_extract(new.data, '$.medical_domains')
+                BEGIN
+                    DELETE FROM paper_domains WHERE arxiv_id = old.arxiv_id;
+                    INSERT INTO paper_domains (arxiv_id, domain)
+                    SELECT new.arxiv_id, value FROM json_each(new.data, '$.medical_domains');
+                    DELETE FROM build_cache WHERE key = 'statistics';
+                END
+            """)
+            if not has_domains:
+                self.conn.execute("""
+                    INSERT INTO paper_domains (arxiv_id, domain)
+                    SELECT papers.arxiv_id, domains.value
+                    FROM papers, json_each(papers.data, '$.medical_domains') AS domains
+                """)
+
+            # Derived values (e.g. statistics) reused across site builds until
+            # the papers they depend on change
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS build_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            for event in ("INSERT", "DELETE", "UPDATE OF published, relevance_score"):
+                name = "papers_build_cache_" + event.split()[0].lower()
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON papers BEGIN
+                        DELETE FROM build_cache WHERE key = 'statistics';
+                    END
+                """)
+
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS metadata (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+    def _create_fts(self) -> bool:
+        """
+        Create the full-text search index over title, abstract and keywords
+
+        Returns:
+            True if FTS5 is available, False to fall back to scanning records
+        """
+        try:
+            with self.conn:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'"
+                ).fetchone()
+                self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(content)")
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+                        INSERT INTO papers_fts (rowid, content)
+                        VALUES (new.rowid, {_FTS_CONTENT_SQL.format(data='new.data')});
+                    END
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+                        DELETE FROM papers_fts WHERE rowid = old.rowid;
+                    END
+                """)
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF data ON papers
+                    WHEN json_extract(old.data, '$.title') IS NOT json_extract(new.data, '$.title')
+                        OR json_extract(old.data, '$.abstract') IS NOT json_extract(new.data, '$.abstract')
+                        OR json_extract(old.data, '$.keywords') IS NOT json_extract(new.data, '$.keywords')
+                    BEGIN
+                        UPDATE papers_fts SET content = {_FTS_CONTENT_SQL.format(data='new.data')}
+                        WHERE rowid = new.rowid;
+                    END
+                """)
+                if not exists:
+                    self.conn.execute(f"""
+                        INSERT INTO papers_fts (rowid, content)
+                        SELECT rowid, {_FTS_CONTENT_SQL.format(data='data')} FROM papers
+                    """)
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable ({e}), falling back to scanning")
+            return False
+        return True
+
+    def _migrate_legacy_json(self, legacy_path: Path):
+        """
+        Import papers from the old TinyDB JSON file into an empty database
+
+        Args:
+            legacy_path: Path to the TinyDB JSON document
+        """
+        legacy_path = Path(legacy_path)
+        if not legacy_path.exists():
+            return
+        if self.conn.execute("SELECT 1 FROM papers LIMIT 1").fetchone():
+            return
+
+        legacy = json.loads(legacy_path.read_text(encoding='utf-8') or '{}')
+        papers = list(legacy.get('papers', {}).values())
+
+        with self.conn:
+            self.conn.executemany(self._INSERT_SQL, [_row(p) for p in papers])
+            for entry in legacy.get('metadata', {}).values():
+                if entry.get('key') == 'last_run':
+                    self._set_metadata('last_run', entry.get('timestamp'))
+
+        print(f"Migrated {len(papers)} papers from {legacy_path.name}")
+
+    def invalidate(self):
+        """
+        Reload cached state from the database
+
+        Call this after another process or connection has written to the
+        database file, since those writes bypass the in-memory ID index.
+        """
+        self._known_ids = {row[0] for row in self.conn.execute("SELECT arxiv_id FROM papers")}
+
     def paper_exists(self, arxiv_id: str) -> bool:
         """
         Check if paper already exists in database
@@ -36,8 +289,7 @@ class PaperDatabase:
         Returns:
             True if paper exists
         """
-        Paper = Query()
-        return len(self.papers.search(Paper.arxiv_id == arxiv_id)) > 0
+        return arxiv_id in self._known_ids
 
     def add_paper(self, paper: Dict, summary: Dict, relevance_info: Dict) -> bool:
         """
@@ -56,6 +308,66 @@ class PaperDatabase:
             print(f"  Paper {paper['arxiv_id']} already in database, skipping")
             return False
 
+        full_record = self._build_record(paper, summary, relevance_info)
+
+        with self.conn:
+            inserted = self.conn.execute(self._INSERT_SQL, _row(full_record)).rowcount
+        self._known_ids.add(full_record['arxiv_id'])
+        if not inserted:
+            print(f"  Paper {paper['arxiv_id']} already in database, skipping")
+            return False
+        print(f"  Added paper to database: {paper['arxiv_id']}")
+        return True
+
+    def bulk_add_papers(self, records: List[Tuple[Dict, Dict, Dict]]) -> int:
+        """
+        Add several papers in a single transaction
+
+        Args:
+            records: (paper, summary, relevance_info) tuples, as passed to
+                add_paper()
+
+        Returns:
+            Number of papers added
+        """
+        now = datetime.now()
+        added = 0
+        # Only marked as known once the transaction commits; after a rollback
+        # these papers were never stored and must not be skipped later
+        stored = set()
+
+        with self.conn:
+            for paper, summary, relevance_info in records:
+                if self.paper_exists(paper['arxiv_id']) or paper['arxiv_id'] in stored:
+                    print(f"  Paper {paper['arxiv_id']} already in database, skipping")
+                    continue
+
+                full_record = self._build_record(paper, summary, relevance_info, now)
+                if self.conn.execute(self._INSERT_SQL, _row(full_record)).rowcount:
+                    added += 1
+                    print(f"  Added paper to database: {paper['arxiv_id']}")
+                stored.add(full_record['arxiv_id'])
+
+        self._known_ids.update(stored)
+        return added
+
+    def _build_record(self, paper: Dict, summary: Dict, relevance_info: Dict,
+                      now: datetime = None) -> Dict:
+        """
+        Combine paper metadata, summary and relevance results into one record
+
+        Args:
+            paper: Paper metadata from arXiv
+            summary: AI-generated summary
+            relevance_info: Relevance check results
+            now: Time the paper is added (defaults to the current time)
+
+        Returns:
+            Record as stored in the database
+        """
+        if now is None:
+            now = datetime.now()
+
         # Combine all information
         full_record = {
             **paper,
@@ -72,13 +384,38 @@ class PaperDatabase:
             'relevance_score': relevance_info.get('relevance_score', 0.0),
             'relevance_reasoning': relevance_info.get('reasoning', ''),
             'ai_health_application': relevance_info.get('ai_health_application', ''),
-            'added_to_db': datetime.now().isoformat(),
+            'added_to_db': now.isoformat(),
             'pdf_path': paper.get('pdf_path', None)
         }
+        full_record['trending_score'] = PaperEnhancements.calculate_trending_score(full_record, now)
 
-        self.papers.insert(full_record)
-        print(f"  Added paper to database: {paper['arxiv_id']}")
-        return True
+        # Epoch seconds let date-window checks compare integers instead of parsing
+        try:
+            full_record['published_epoch'] = int(parse_published(paper.get('published') or '').timestamp())
+        except ValueError:
+            pass
+        return full_record
+
+    def iter_papers(self, limit: int = None, sort_by: str = 'published') -> Iterator[Dict]:
+        """
+        Iterate over papers without loading them all into memory
+
+        Args:
+            limit: Maximum number of papers to yield
+            sort_by: Field to sort by (published, relevance_score, added_to_db,
+                trending_score); any other value yields papers unsorted
+
+        Yields:
+            Paper records, decoded one row at a time
+        """
+        sql = "SELECT data FROM papers"
+        column = SORT_COLUMNS.get(sort_by)
+        if column:
+            sql += f" ORDER BY {column} DESC"
+        sql += " LIMIT ?"
+
+        for (data,) in self.conn.execute(sql, (limit or -1,)):
+            yield _decode(data)
 
     def get_all_papers(self, limit: int = None, sort_by: str = 'published') -> List[Dict]:
         """
@@ -86,24 +423,73 @@ class PaperDatabase:
 
         Args:
             limit: Maximum number of papers to return
-            sort_by: Field to sort by (published, relevance_score, added_to_db)
+            sort_by: Field to sort by (published, relevance_score, added_to_db,
+                trending_score)
 
         Returns:
             List of paper records
         """
-        papers = self.papers.all()
+        return list(self.iter_papers(limit, sort_by))
+
+    def refresh_trending_scores(self, now: datetime = None) -> int:
+        """
+        Recompute the stored trending score of every paper
 
-        # Sort papers
-        if sort_by == 'published':
-            papers.sort(key=lambda x: x.get('published', ''), reverse=True)
-        elif sort_by == 'relevance_score':
-            papers.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-        elif sort_by == 'added_to_db':
-            papers.sort(key=lambda x: x.get('added_to_db', ''), reverse=True)
+        Trending scores decay with paper age, so this should run once before
+        the site is generated rather than scoring papers during rendering.
 
-        if limit:
-            return papers[:limit]
-        return papers
+        Args:
+            now: Reference time for paper ages (defaults to the current time)
+
+        Returns:
+            Number of papers updated
+        """
+        if now is None:
+            now = datetime.now()
+
+        updates = []
+        for (data,) in self.conn.execute("SELECT data FROM papers"):
+            paper = json.loads(data)
+            score = PaperEnhancements.calculate_trending_score(paper, now)
+            if score != paper.get('trending_score'):
+                updates.append((score, score, paper['arxiv_id']))
+
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE papers SET trending_score = ?, data = json_set(data, '$.trending_score', ?) WHERE arxiv_id = ?",
+                updates
+            )
+        return len(updates)
+
+    def get_papers_needing_s2_refresh(self, max_age_days: int = 7) -> List[Dict]:
+        """
+        Get papers whose Semantic Scholar data is missing or stale
+
+        Args:
+            max_age_days: Days after which cached data is refetched
+
+        Returns:
+            List of paper records
+        """
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        rows = self.conn.execute("""
+            SELECT data FROM papers
+            WHERE COALESCE(json_extract(data, '$.s2_cache.fetched_at'), '') < ?
+        """, (cutoff,))
+        return [_decode(data) for (data,) in rows]
+
+    def update_papers(self, papers: List[Dict]):
+        """
+        Overwrite stored records with updated versions in one transaction
+
+        Args:
+            papers: Full paper records (matched by arxiv_id)
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE papers SET data = ? WHERE arxiv_id = ?",
+                [(_encode(paper), paper['arxiv_id']) for paper in papers]
+            )
 
     def get_paper_by_id(self, arxiv_id: str) -> Optional[Dict]:
         """
@@ -115,9 +501,10 @@ class PaperDatabase:
         Returns:
             Paper record or None
         """
-        Paper = Query()
-        results = self.papers.search(Paper.arxiv_id == arxiv_id)
-        return results[0] if results else None
+        row = self.conn.execute(
+            "SELECT data FROM papers WHERE arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+        return _decode(row[0]) if row else None
 
     def search_papers(self, query: str) -> List[Dict]:
         """
@@ -127,18 +514,26 @@ class PaperDatabase:
             query: Search query
 
         Returns:
-            List of matching papers
+            List of matching papers, best matches first
         """
-        Paper = Query()
-        query_lower = query.lower()
+        if self._fts:
+            rows = self.conn.execute("""
+                SELECT papers.data FROM papers_fts
+                JOIN papers ON papers.rowid = papers_fts.rowid
+                WHERE papers_fts MATCH ?
+                ORDER BY papers_fts.rank
+            """, (_fts_query(query),))
+            return [_decode(data) for (data,) in rows]
 
-        results = self.papers.search(
-            (Paper.title.search(query_lower, flags=re.IGNORECASE)) |
-            (Paper.abstract.search(query_lower, flags=re.IGNORECASE)) |
-            (Paper.keywords.any(query_lower))
-        )
+        query_lower = query.lower()
+        pattern = _search_pattern(query_lower)
 
-        return results
+        return [
+            paper for paper in self.iter_papers(sort_by=None)
+            if pattern.search(paper.get('title', ''))
+            or pattern.search(paper.get('abstract', ''))
+            or query_lower in paper.get('keywords', [])
+        ]
 
     def get_papers_by_domain(self, domain: str) -> List[Dict]:
         """
@@ -150,52 +545,67 @@ class PaperDatabase:
         Returns:
             List of papers in that domain
         """
-        Paper = Query()
-        return self.papers.search(Paper.medical_domains.any(domain.lower()))
+        domain_lower = domain.lower()
+        return [
+            paper for paper in self.iter_papers(sort_by=None)
+            if domain_lower in paper.get('medical_domains', [])
+        ]
 
     def get_statistics(self) -> Dict:
         """
         Get database statistics
 
+        Results are cached in the build_cache table and recomputed only after
+        papers have been added, removed or rescored.
+
         Returns:
             Dictionary with statistics
         """
-        papers = self.papers.all()
-
-        # Collect all domains
-        all_domains = []
-        for paper in papers:
-            all_domains.extend(paper.get('medical_domains', []))
-
-        # Count domains
-        domain_counts = {}
-        for domain in all_domains:
-            domain_counts[domain] = domain_counts.get(domain, 0) + 1
-
-        # Get date range
-        dates = [p.get('published', '') for p in papers if p.get('published')]
-        dates.sort()
+        row = self.conn.execute("SELECT value FROM build_cache WHERE key = 'statistics'").fetchone()
+        if row:
+            stats = json.loads(row[0])
+            stats['top_domains'] = [tuple(item) for item in stats['top_domains']]
+            return stats
+
+        total, average, earliest, latest = self.conn.execute("""
+            SELECT COUNT(*), AVG(relevance_score), MIN(NULLIF(published, '')), MAX(NULLIF(published, ''))
+            FROM papers
+        """).fetchone()
+
+        domain_counts = dict(self.conn.execute("""
+            SELECT domain, COUNT(*) FROM paper_domains
+            GROUP BY domain
+            ORDER BY COUNT(*) DESC, domain
+        """).fetchall())
 
         stats = {
-            'total_papers': len(papers),
+            'total_papers': total,
             'date_range': {
-                'earliest': dates[0] if dates else None,
-                'latest': dates[-1] if dates else None
+                'earliest': earliest,
+                'latest': latest
             },
-            'average_relevance': sum(p.get('relevance_score', 0) for p in papers) / len(papers) if papers else 0,
+            'average_relevance': average or 0,
             'domains': domain_counts,
-            'top_domains': sorted(domain_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            'top_domains': list(domain_counts.items())[:10]
         }
 
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO build_cache (key, value, updated_at) VALUES ('statistics', ?, ?)",
+                (_encode(stats), datetime.now().isoformat())
+            )
         return stats
 
+    def _set_metadata(self, key: str, value: str):
+        """Insert or replace a metadata value"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value)
+        )
+
     def update_last_run(self):
         """Update last run timestamp in metadata"""
-        Metadata = Query()
-        self.metadata.upsert(
-            {'key': 'last_run', 'timestamp': datetime.now().isoformat()},
-            Metadata.key == 'last_run'
-        )
+        with self.conn:
+            self._set_metadata('last_run', datetime.now().isoformat())
 
     def get_last_run(self) -> Optional[str]:
         """
@@ -204,10 +614,11 @@ class PaperDatabase:
         Returns:
             ISO timestamp string or None
         """
-        Metadata = Query()
-        result = self.metadata.search(Metadata.key == 'last_run')
-        return result[0]['timestamp'] if result else None
+        row = self.conn.execute(
+            "SELECT value FROM metadata WHERE key = 'last_run'"
+        ).fetchone()
+        return row[0] if row else None
 
     def close(self):
         """Close database connection"""
-        self.db.close()
+        self.conn.close()
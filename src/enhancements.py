@@ -2,45 +2,124 @@
 Additional features and enhancements for Health AI Hub
 """
 import json
+from bisect import bisect_left
+from collections import Counter, defaultdict
 from typing import Dict, List
 from datetime import datetime, timedelta
 
+# Recency score by paper age in days: 0 days -> 100, 1-3 -> 90, 4-7 -> 70,
+# 8-14 -> 50, 15-30 -> 30, older -> 10. Negative ages (publish times slightly
+# ahead of the local clock) score like 1-3 days.
+_RECENCY_EDGES = (-1, 0, 3, 7, 14, 30)
+_RECENCY_SCORES = (90, 100, 90, 70, 50, 30, 10)
+
+# Braces in titles/author names would unbalance BibTeX fields
+_BIBTEX_ESCAPES = str.maketrans({'{': r'\{', '}': r'\}'})
+
+
+def _json_default(obj):
+    """Serialize the sets used in aggregated stats as sorted lists"""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_json(obj) -> str:
+    """
+    Serialize enhancement results (e.g. extract_author_info) to compact JSON
+
+    Args:
+        obj: JSON-compatible data, possibly containing sets
+
+    Returns:
+        JSON string
+    """
+    return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(',', ':'))
+
+
+class CitationBuilder:
+    """Formats one paper in several citation styles, sharing the prepared fields"""
+
+    def __init__(self, paper: Dict):
+        """
+        Prepare the fields used by every citation format
+
+        Args:
+            paper: Paper dictionary
+        """
+        self.paper = paper
+        self.year = paper.get('published', '')[:4]
+        self.authors_trunc = paper.get('authors', [])[:5]
+        self.arxiv_id_clean = paper['arxiv_id'].replace('/', '_')
+        self.abstract_trunc = paper.get('abstract', '')[:500]
+
+    def to_bibtex(self) -> str:
+        """Format as BibTeX (first three authors)"""
+        paper = self.paper
+        authors = ' and '.join(self.authors_trunc[:3]).translate(_BIBTEX_ESCAPES)
+        title = paper['title'].translate(_BIBTEX_ESCAPES)
+
+        return f"""@article{{{self.arxiv_id_clean},
+  title={{{title}}},
+  author={{{authors}}},
+  journal={{arXiv preprint arXiv:{paper['arxiv_id']}}},
+  year={{{self.year}}},
+  url={{{paper['arxiv_url']}}}
+}}"""
+
+    def to_ris(self) -> str:
+        """Format as RIS"""
+        parts = ["TY  - JOUR\n", f"TI  - {self.paper['title']}\n"]
+        parts.extend(f"AU  - {author}\n" for author in self.authors_trunc)
+        parts.append(f"""PY  - {self.year}
+JO  - arXiv preprint
+UR  - {self.paper['arxiv_url']}
+AB  - {self.abstract_trunc}
+ER  -
+""")
+        return ''.join(parts)
+
+    def to_endnote(self) -> str:
+        """Format as EndNote"""
+        parts = [f"%T {self.paper['title']}\n"]
+        parts.extend(f"%A {author}\n" for author in self.authors_trunc)
+        parts.append(f"""%D {self.year}
+%J arXiv preprint
+%U {self.paper['arxiv_url']}
+%X {self.abstract_trunc}
+""")
+        return ''.join(parts)
+
 
 class PaperEnhancements:
     """Helper class for paper enhancements like trending, bookmarks, etc."""
 
     @staticmethod
-    def calculate_trending_score(paper: Dict) -> float:
+    def calculate_trending_score(paper: Dict, now: datetime = None) -> float:
         """
         Calculate trending score based on recency and relevance
 
         Args:
             paper: Paper dictionary
+            now: Reference time for the paper's age (defaults to the current
+                time; pass one snapshot when scoring many papers)
 
         Returns:
             Trending score (0-100)
         """
+        if now is None:
+            now = datetime.now()
+
         # Get paper age in days
-        published_str = paper.get('published', datetime.now().isoformat())
+        published_str = paper.get('published', now.isoformat())
         # Remove timezone info if present for comparison
         if 'T' in published_str:
             published_str = published_str.split('+')[0].split('Z')[0]
         published = datetime.fromisoformat(published_str)
-        age_days = (datetime.now() - published).days
+        age_days = (now - published).days
 
         # Recency score (newer = higher)
-        if age_days == 0:
-            recency_score = 100
-        elif age_days <= 3:
-            recency_score = 90
-        elif age_days <= 7:
-            recency_score = 70
-        elif age_days <= 14:
-            recency_score = 50
-        elif age_days <= 30:
-            recency_score = 30
-        else:
-            recency_score = 10
+        recency_score = _RECENCY_SCORES[bisect_left(_RECENCY_EDGES, age_days)]
 
         # Relevance score (from AI)
         relevance_score = paper.get('relevance_score', 0.5) * 100
@@ -65,18 +144,7 @@ class PaperEnhancements:
         Returns:
             BibTeX formatted string
         """
-        arxiv_id = paper['arxiv_id'].replace('/', '_')
-        year = paper.get('published', '')[:4]
-        authors = ' and '.join(paper.get('authors', [])[:3])
-
-        bibtex = f"""@article{{{arxiv_id},
-  title={{{paper['title']}}},
-  author={{{authors}}},
-  journal={{arXiv preprint arXiv:{paper['arxiv_id']}}},
-  year={{{year}}},
-  url={{{paper['arxiv_url']}}}
-}}"""
-        return bibtex
+        return CitationBuilder(paper).to_bibtex()
 
     @staticmethod
     def generate_ris(paper: Dict) -> str:
@@ -89,22 +157,7 @@ class PaperEnhancements:
         Returns:
             RIS formatted string
         """
-        authors = paper.get('authors', [])
-        year = paper.get('published', '')[:4]
-
-        ris = f"""TY  - JOUR
-TI  - {paper['title']}
-"""
-        for author in authors[:5]:
-            ris += f"AU  - {author}\n"
-
-        ris += f"""PY  - {year}
-JO  - arXiv preprint
-UR  - {paper['arxiv_url']}
-AB  - {paper.get('abstract', '')[:500]}
-ER  -
-"""
-        return ris
+        return CitationBuilder(paper).to_ris()
 
     @staticmethod
     def generate_endnote(paper: Dict) -> str:
@@ -117,20 +170,7 @@ ER  -
         Returns:
             EndNote formatted string
         """
-        authors = paper.get('authors', [])
-        year = paper.get('published', '')[:4]
-
-        endnote = f"""%T {paper['title']}
-"""
-        for author in authors[:5]:
-            endnote += f"%A {author}\n"
-
-        endnote += f"""%D {year}
-%J arXiv preprint
-%U {paper['arxiv_url']}
-%X {paper.get('abstract', '')[:500]}
-"""
-        return endnote
+        return CitationBuilder(paper).to_endnote()
 
     @staticmethod
     def extract_author_info(papers: List[Dict]) -> Dict[str, Dict]:
@@ -142,13 +182,24 @@ ER  -
 
         Returns:
             Dictionary mapping author names to their papers and stats
+            (each author's 'domains' is a set; serialize with to_json())
         """
         authors = {}
 
         for paper in papers:
+            # Per-paper values are shared by all of its authors
+            paper_ref = {
+                'arxiv_id': paper['arxiv_id'],
+                'title': paper['title'],
+                'published': paper.get('published')
+            }
+            paper_domains = set(paper.get('medical_domains', []))
+            paper_relevance = paper.get('relevance_score', 0)
+
             for author_name in paper.get('authors', []):
-                if author_name not in authors:
-                    authors[author_name] = {
+                author = authors.get(author_name)
+                if author is None:
+                    author = authors[author_name] = {
                         'name': author_name,
                         'paper_count': 0,
                         'papers': [],
@@ -156,18 +207,13 @@ ER  -
                         'total_relevance': 0
                     }
 
-                authors[author_name]['paper_count'] += 1
-                authors[author_name]['papers'].append({
-                    'arxiv_id': paper['arxiv_id'],
-                    'title': paper['title'],
-                    'published': paper.get('published')
-                })
-                authors[author_name]['domains'].update(paper.get('medical_domains', []))
-                authors[author_name]['total_relevance'] += paper.get('relevance_score', 0)
+                author['paper_count'] += 1
+                author['papers'].append(paper_ref)
+                author['domains'] |= paper_domains
+                author['total_relevance'] += paper_relevance
 
-        # Convert sets to lists for JSON serialization
+        # Domains stay sets; to_json() converts them when serializing
         for author in authors.values():
-            author['domains'] = list(author['domains'])
             author['avg_relevance'] = author['total_relevance'] / author['paper_count'] if author['paper_count'] > 0 else 0
 
         return authors
@@ -183,38 +229,33 @@ ER  -
         Returns:
             Dictionary with domain trends and statistics
         """
-        domain_stats = {}
-        domain_timeline = {}
+        domain_counts = Counter()
+        domain_relevance = defaultdict(float)
+        domain_papers = defaultdict(list)
+        domain_timeline = defaultdict(Counter)
 
         for paper in papers:
             pub_date = paper.get('published', '')[:7]  # YYYY-MM format
+            relevance = paper.get('relevance_score', 0)
+            arxiv_id = paper['arxiv_id']
 
             for domain in paper.get('medical_domains', []):
-                # Overall stats
-                if domain not in domain_stats:
-                    domain_stats[domain] = {
-                        'count': 0,
-                        'total_relevance': 0,
-                        'papers': []
-                    }
-
-                domain_stats[domain]['count'] += 1
-                domain_stats[domain]['total_relevance'] += paper.get('relevance_score', 0)
-                domain_stats[domain]['papers'].append(paper['arxiv_id'])
-
-                # Timeline stats
-                if domain not in domain_timeline:
-                    domain_timeline[domain] = {}
-
-                if pub_date not in domain_timeline[domain]:
-                    domain_timeline[domain][pub_date] = 0
-
+                domain_counts[domain] += 1
+                domain_relevance[domain] += relevance
+                domain_papers[domain].append(arxiv_id)
                 domain_timeline[domain][pub_date] += 1
 
-        # Calculate averages
-        for domain in domain_stats:
-            count = domain_stats[domain]['count']
-            domain_stats[domain]['avg_relevance'] = domain_stats[domain]['total_relevance'] / count if count > 0 else 0
+        # Assemble per-domain stats and averages
+        domain_stats = {
+            domain: {
+                'count': count,
+                'total_relevance': domain_relevance[domain],
+                'papers': domain_papers[domain],
+                'avg_relevance': domain_relevance[domain] / count
+            }
+            for domain, count in domain_counts.items()
+        }
+        domain_timeline = {domain: dict(timeline) for domain, timeline in domain_timeline.items()}
 
         return {
             'stats': domain_stats,
@@ -2,8 +2,35 @@
 Semantic Scholar API integration for citation counts and paper metadata
 """
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
+import config
+from src.utils import DiskCache, RateLimiter
+
+# Seconds a cached lookup stays valid. Papers Semantic Scholar doesn't know
+# yet are retried sooner, since new preprints usually show up within hours
+CACHE_TTL = 24 * 60 * 60
+MISSING_TTL = 6 * 60 * 60
+
+_MISS = object()
+
+
+def apply_s2_data(paper: Dict, s2_data: Optional[Dict], fetched_at: str):
+    """
+    Merge Semantic Scholar results into a paper record
+
+    The parsed response is kept under paper['s2_cache'] with its fetch time,
+    and its fields (citation_count, tldr, ...) are copied onto the paper.
+
+    Args:
+        paper: Paper record, updated in place
+        s2_data: Parsed details from SemanticScholarAPI, or None if unknown
+        fetched_at: ISO timestamp of the lookup
+    """
+    paper['s2_cache'] = {'fetched_at': fetched_at, 's2_data': s2_data}
+    if s2_data:
+        paper.update(s2_data)
 
 
 class SemanticScholarAPI:
@@ -11,11 +38,48 @@ class SemanticScholarAPI:
 
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
 
-    def __init__(self):
+    # Fields read by _parse_paper_data
+    PAPER_FIELDS = 'title,citationCount,influentialCitationCount,referenceCount,publicationDate,authors,year,fieldsOfStudy,s2FieldsOfStudy,tldr'
+
+    # Maximum number of IDs accepted by the /paper/batch endpoint
+    BATCH_SIZE = 500
+
+    # Request rate shared by all threads using this client
+    REQUESTS_PER_SECOND = 3
+
+    # Keep-alive connections held open to the API
+    POOL_SIZE = 5
+
+    def __init__(self, cache_dir=None):
+        """
+        Initialize Semantic Scholar client
+
+        Args:
+            cache_dir: Directory for cached paper lookups (defaults to
+                config.S2_CACHE_DIR)
+        """
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Health-AI-Hub/1.0 (bryan@arxiv-health.org)'
         })
+        # Keep connections alive so threads sharing the client reuse them
+        # instead of opening new TLS connections, and back off
+        # exponentially (honouring Retry-After) when throttled or when the
+        # API has a transient failure. POST is included for /paper/batch,
+        # which is a read despite the method.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.session.mount("https://", HTTPAdapter(
+            max_retries=retry, pool_connections=1, pool_maxsize=self.POOL_SIZE
+        ))
+        self._cache = DiskCache(cache_dir or config.S2_CACHE_DIR, ttl=CACHE_TTL)
+        self._limiter = RateLimiter(self.REQUESTS_PER_SECOND, 1.0)
 
     def get_paper_by_arxiv_id(self, arxiv_id: str) -> Optional[Dict]:
         """
@@ -27,23 +91,32 @@ class SemanticScholarAPI:
         Returns:
             Dictionary with citation count, influential citations, references, etc.
         """
-        # Clean arXiv ID (remove version if present)
-        clean_id = arxiv_id.split('v')[0] if 'v' in arxiv_id else arxiv_id
+        clean_id = self._clean_id(arxiv_id)
+        # Old-style IDs contain a slash, so hash them into a flat cache key
+        cache_key = DiskCache.make_key(clean_id)
+
+        cached = self._cache.get(cache_key, _MISS)
+        if cached is not _MISS:
+            return cached
 
         # Query Semantic Scholar
         url = f"{self.BASE_URL}/paper/arXiv:{clean_id}"
         params = {
-            'fields': 'title,citationCount,influentialCitationCount,referenceCount,publicationDate,authors,year,fieldsOfStudy,s2FieldsOfStudy,embedding,tldr'
+            'fields': self.PAPER_FIELDS
         }
 
         try:
+            self._limiter.wait()
             response = self.session.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
-                return self._parse_paper_data(data)
+                paper = self._parse_paper_data(data)
+                self._cache.set(cache_key, paper)
+                return paper
             elif response.status_code == 404:
                 # Paper not in Semantic Scholar yet (common for new preprints)
+                self._cache.set(cache_key, None, ttl=MISSING_TTL)
                 return None
             else:
                 print(f"Semantic Scholar API error: {response.status_code}")
@@ -53,9 +126,59 @@ class SemanticScholarAPI:
             print(f"Error fetching from Semantic Scholar: {e}")
             return None
 
-        finally:
-            # Rate limiting: 100 requests per 5 minutes for free tier
-            time.sleep(0.1)
+    def get_papers_batch(self, arxiv_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get paper details for many arXiv IDs using the batch endpoint
+
+        Sends one request per BATCH_SIZE IDs instead of one per paper, and
+        only for IDs that aren't in the local cache.
+
+        Args:
+            arxiv_ids: arXiv IDs (versions are ignored)
+
+        Returns:
+            Dictionary mapping each arXiv ID to its parsed details, or None
+            if Semantic Scholar doesn't know the paper. IDs whose request
+            failed are left out so callers can retry them later
+        """
+        results = {}
+        uncached = []
+        for arxiv_id in arxiv_ids:
+            cached = self._cache.get(DiskCache.make_key(self._clean_id(arxiv_id)), _MISS)
+            if cached is _MISS:
+                uncached.append(arxiv_id)
+            else:
+                results[arxiv_id] = cached
+
+        url = f"{self.BASE_URL}/paper/batch"
+
+        for start in range(0, len(uncached), self.BATCH_SIZE):
+            batch = uncached[start:start + self.BATCH_SIZE]
+            body = {'ids': [f"ARXIV:{self._clean_id(arxiv_id)}" for arxiv_id in batch]}
+
+            try:
+                self._limiter.wait()
+                response = self.session.post(url, params={'fields': self.PAPER_FIELDS}, json=body, timeout=30)
+
+                if response.status_code == 200:
+                    # The response is positional, with null for unknown IDs
+                    for arxiv_id, data in zip(batch, response.json()):
+                        paper = self._parse_paper_data(data) if data else None
+                        self._cache.set(DiskCache.make_key(self._clean_id(arxiv_id)), paper,
+                                        ttl=None if paper else MISSING_TTL)
+                        results[arxiv_id] = paper
+                    continue
+                print(f"Semantic Scholar API error: {response.status_code}")
+
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching from Semantic Scholar: {e}")
+
+        return results
+
+    @staticmethod
+    def _clean_id(arxiv_id: str) -> str:
+        """Strip the version suffix from an arXiv ID"""
+        return arxiv_id.split('v')[0] if 'v' in arxiv_id else arxiv_id
 
     def _parse_paper_data(self, data: Dict) -> Dict:
         """Parse Semantic Scholar API response"""
@@ -82,7 +205,7 @@ class SemanticScholarAPI:
         Returns:
             List of related paper dictionaries
         """
-        clean_id = arxiv_id.split('v')[0] if 'v' in arxiv_id else arxiv_id
+        clean_id = self._clean_id(arxiv_id)
 
         url = f"{self.BASE_URL}/paper/arXiv:{clean_id}/citations"
         params = {
@@ -91,6 +214,7 @@ class SemanticScholarAPI:
         }
 
         try:
+            self._limiter.wait()
             response = self.session.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
@@ -103,9 +227,6 @@ class SemanticScholarAPI:
             print(f"Error fetching related papers: {e}")
             return []
 
-        finally:
-            time.sleep(0.1)
-
     def search_papers(self, query: str, limit: int = 10, fields: str = None) -> List[Dict]:
         """
         Search for papers by query
@@ -129,6 +250,7 @@ class SemanticScholarAPI:
         }
 
         try:
+            self._limiter.wait()
             response = self.session.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
@@ -139,6 +261,3 @@ class SemanticScholarAPI:
 
         except requests.exceptions.RequestException:
             return []
-
-        finally:
-            time.sleep(0.1)
@@ -0,0 +1,36 @@
+"""
+Shared Jinja2 environment for the website templates
+"""
+from pathlib import Path
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+import config
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+config.JINJA_CACHE_DIR.mkdir(exist_ok=True)
+
+# Templates are compiled once per process and their bytecode is cached on
+# disk, so repeated site builds skip Jinja's parse/compile step entirely.
+# auto_reload is off because templates don't change during a build.
+# trim_blocks/lstrip_blocks drop the indentation and newline around block
+# tags, so loops and conditionals leave no blank lines in the output.
+env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    bytecode_cache=FileSystemBytecodeCache(str(config.JINJA_CACHE_DIR)),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+
+def get_template(name: str) -> Template:
+    """
+    Load a compiled template from src/templates
+
+    Args:
+        name: Template file name
+
+    Returns:
+        Compiled Jinja2 template (cached by the environment)
+    """
+    return env.get_template(name)
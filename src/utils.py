@@ -1,49 +1,433 @@
 """
 Utility functions for website generation
 """
-from datetime import datetime, timedelta
-from typing import List, Dict
+import gzip
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Union
 from collections import Counter
+from heapq import nlargest
+from operator import itemgetter
 
 
-def get_weekly_stats(papers: List[Dict]) -> Dict:
+class RateLimiter:
+    """Thread-safe limiter allowing at most `max_calls` calls per `period` seconds"""
+
+    def __init__(self, max_calls: int, period: float):
+        """
+        Initialize rate limiter
+
+        Args:
+            max_calls: Number of calls allowed per period
+            period: Length of the period in seconds
+        """
+        self.interval = period / max_calls
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller is allowed to issue its next request"""
+        # Reserve the next free slot under the lock, then sleep outside it so
+        # other threads can queue up behind us
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DiskCache:
+    """Persistent key/value cache storing one JSON file per key"""
+
+    def __init__(self, directory: Path, ttl: float = None):
+        """
+        Initialize disk cache
+
+        Args:
+            directory: Directory holding the cache files
+            ttl: Seconds before an entry expires (None keeps entries forever)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Build a filesystem-safe cache key from arbitrary parts"""
+        return hashlib.sha256(":".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, default=None):
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key from make_key()
+            default: Value returned on a miss or expired entry
+
+        Returns:
+            Cached value or default
+        """
+        try:
+            entry = json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return default
+
+        ttl = entry.get("ttl", self.ttl)
+        if ttl is not None and time.time() - entry.get("created", 0) > ttl:
+            return default
+        return entry.get("value", default)
+
+    def set(self, key: str, value, ttl: float = None):
+        """
+        Store a JSON-serializable value
+
+        Args:
+            key: Cache key from make_key()
+            value: Value to store
+            ttl: Seconds before this entry expires, overriding the cache's ttl
+        """
+        path = self.directory / f"{key}.json"
+        # Write to a per-thread temp file and rename, so concurrent writers
+        # and readers never see a partially written entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        entry = {"created": time.time(), "value": value}
+        if ttl is not None:
+            entry["ttl"] = ttl
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+_PREFETCH_DONE = object()
+
+
+def prefetch(iterable: Iterable, maxsize: int = 16) -> Iterator:
+    """
+    Consume an iterable on a background thread
+
+    Items are handed over through a bounded queue, so a slow producer (e.g.
+    a paginated API) keeps running while the caller works on earlier items,
+    but never gets more than `maxsize` items ahead.
+
+    Args:
+        iterable: Source of items
+        maxsize: Maximum number of buffered items
+
+    Yields:
+        Items from the iterable, in order
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    error = []
+
+    def produce():
+        try:
+            for item in iterable:
+                buffer.put(item)
+        except BaseException as e:
+            error.append(e)
+        finally:
+            buffer.put(_PREFETCH_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    while True:
+        item = buffer.get()
+        if item is _PREFETCH_DONE:
+            break
+        yield item
+
+    if error:
+        raise error[0]
+
+
+def _write_bytes(path, data: bytes):
+    """Write bytes with a single open/write/close on a raw file descriptor"""
+    view = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write less than asked for on some filesystems
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _as_bytes(content: Union[str, bytes]) -> bytes:
+    """Encode text as UTF-8, passing already-encoded bytes through"""
+    return content.encode('utf-8') if isinstance(content, str) else content
+
+
+def write_file(path: Path, content: Union[str, bytes]):
+    """
+    Write a file as UTF-8 with a single open/write/close
+
+    Encodes once and hands the bytes straight to os.write, skipping the
+    buffered text I/O layer used by Path.write_text.
+
+    Args:
+        path: Destination file
+        content: Text, or bytes that are already UTF-8 encoded
+    """
+    _write_bytes(path, _as_bytes(content))
+
+
+def write_file_if_changed(path: Path, content: Union[str, bytes]) -> bool:
+    """
+    Write a text file only if its contents differ from what is on disk
+
+    Leaves the mtime of unchanged files alone, so browser and CDN caches of
+    static assets are not invalidated by a rebuild.
+
+    Args:
+        path: Destination file
+        content: Text, or bytes that are already UTF-8 encoded
+
+    Returns:
+        True if the file was written
+    """
+    data = _as_bytes(content)
+    try:
+        if os.stat(path).st_size == len(data) and Path(path).read_bytes() == data:
+            return False
+    except OSError:
+        pass
+
+    _write_bytes(path, data)
+    return True
+
+
+def copy_if_newer(src: Path, dst: Path) -> bool:
+    """
+    Copy a static file unless the destination is already at least as new
+
+    copy2 carries the source mtime over, so an up-to-date asset costs two
+    stat calls per build.
+
+    Args:
+        src: Source file
+        dst: Destination file
+
+    Returns:
+        True if the file was copied
+    """
+    try:
+        if os.stat(dst).st_mtime >= os.stat(src).st_mtime:
+            return False
+    except FileNotFoundError:
+        pass
+
+    shutil.copy2(src, dst)
+    return True
+
+
+def write_gzip_copy(path: Path, content: Union[str, bytes]):
+    """
+    Write a precompressed copy of a file alongside it as <name>.gz
+
+    Web servers with static gzip support (e.g. nginx gzip_static) serve these
+    directly instead of compressing on every request. mtime is fixed so that
+    identical content produces identical archives.
+
+    Args:
+        path: Path of the uncompressed file
+        content: Content of that file, as text or UTF-8 bytes
+    """
+    _write_bytes(f"{path}.gz", gzip.compress(_as_bytes(content), compresslevel=9, mtime=0))
+
+
+def remove_file(path: Union[Path, str]):
+    """
+    Delete a generated file left over from an earlier build, if there is one
+
+    Args:
+        path: File to delete
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_gzip_copy(path: Path):
+    """
+    Delete the <name>.gz copy of a file, so a gzip_static server doesn't keep
+    serving a stale one once PRECOMPRESS_ASSETS is turned off
+
+    Args:
+        path: Path of the uncompressed file
+    """
+    remove_file(f"{path}.gz")
+
+
+def minify_html(html: str) -> str:
+    """
+    Strip indentation and blank lines from generated HTML
+
+    Outside <pre>, leading whitespace on a line renders the same as the
+    newline before it, so dropping it is safe; documents containing <pre>
+    are returned unchanged. The site's templates keep no text in
+    <textarea>, <script> or <style> blocks, which would otherwise need the
+    same exemption.
+
+    Args:
+        html: Rendered page
+
+    Returns:
+        Page without indentation or whitespace-only lines
+    """
+    if '<pre' in html:
+        return html
+    return '\n'.join(filter(None, (line.strip() for line in html.split('\n'))))
+
+
+def parse_published(published_str: str) -> datetime:
+    """
+    Parse an arXiv ISO 8601 timestamp into an aware UTC-comparable datetime
+
+    Offsets (including a "Z" suffix) are parsed natively rather than being
+    stripped; timestamps without one are taken to be UTC.
+
+    Args:
+        published_str: Timestamp such as "2024-05-01T17:59:59+00:00"
+
+    Returns:
+        Timezone-aware datetime
+
+    Raises:
+        ValueError: If the string is not a valid ISO 8601 timestamp
+    """
+    if published_str.endswith('Z'):
+        published_str = published_str[:-1] + '+00:00'
+    published_date = datetime.fromisoformat(published_str)
+    if published_date.tzinfo is None:
+        published_date = published_date.replace(tzinfo=timezone.utc)
+    return published_date
+
+
+# Shared default for papers without medical_domains
+_EMPTY: tuple = ()
+
+# (monotonic time, UTC datetime) of the last clock read; see _utc_now()
+_NOW_CACHE = [float('-inf'), None]
+_NOW_CACHE_SECONDS = 60
+
+
+def _utc_now() -> datetime:
+    """Return the current UTC time, re-read from the system at most once a minute"""
+    t = time.monotonic()
+    if t - _NOW_CACHE[0] > _NOW_CACHE_SECONDS:
+        _NOW_CACHE[:] = [t, datetime.now(timezone.utc)]
+    return _NOW_CACHE[1]
+
+
+def _is_utc_timestamp(published_str) -> bool:
+    """
+    Check for a UTC "YYYY-MM-DDTHH:MM:SS[.ffffff](+00:00|Z)" timestamp
+
+    The first 19 characters of such a string are a fixed-width sortable key,
+    so callers can slice instead of parsing.
+    """
+    return (
+        type(published_str) is str
+        and len(published_str) >= 20
+        and published_str[10] == 'T'
+        and published_str[19] in '.+Z'
+        and (published_str.endswith('+00:00') or published_str.endswith('Z'))
+    )
+
+
+def _weekly_prefix_length(papers: List[Dict], cutoff_key: str) -> int:
+    """
+    Binary-search the end of the weekly window in a newest-first paper list
+
+    Args:
+        papers: Papers sorted by published timestamp, descending
+        cutoff_key: Oldest timestamp still inside the window, as "YYYY-MM-DDTHH:MM:SS"
+
+    Returns:
+        Number of leading papers published at or after the cutoff
+    """
+    lo, hi = 0, len(papers)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (papers[mid].get('published') or '')[:19] >= cutoff_key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def get_weekly_stats(papers: List[Dict], presorted: bool = False,
+                     include_papers: bool = True) -> Dict:
     """
     Calculate statistics for papers added in the last 7 days
 
     Args:
         papers: List of paper dictionaries
+        presorted: Set when papers are already sorted newest-first by
+            published (as returned by PaperDatabase.get_all_papers), so only
+            the papers inside the weekly window are examined
+        include_papers: Collect the matching papers under 'weekly_papers';
+            when False only the counts are kept and 'weekly_papers' is None
 
     Returns:
         Dictionary with weekly statistics
     """
-    # Calculate date 7 days ago
-    week_ago = datetime.now() - timedelta(days=7)
+    # Calculate date 7 days ago (arXiv timestamps are UTC)
+    week_ago = _utc_now() - timedelta(days=7)
+    cutoff_key = week_ago.strftime('%Y-%m-%dT%H:%M:%S')
+    cutoff_epoch = week_ago.timestamp()
 
-    # Filter papers from last week
-    weekly_papers = []
-    for paper in papers:
+    # On a newest-first list everything past the cutoff is older than a week
+    candidates = papers
+    if presorted:
+        candidates = papers[:_weekly_prefix_length(papers, cutoff_key)]
+
+    # Filter papers from last week and count their domains in the same pass
+    weekly_papers = [] if include_papers else None
+    weekly_count = 0
+    domain_counts = Counter()
+    for paper in candidates:
+        published_epoch = paper.get('published_epoch')
         published_str = paper.get('published', '')
-        if 'T' in published_str:
-            # Remove timezone info if present
-            published_str = published_str.split('+')[0].split('Z')[0]
-        try:
-            published_date = datetime.fromisoformat(published_str)
-            if published_date >= week_ago:
-                weekly_papers.append(paper)
-        except (ValueError, TypeError):
-            continue
+        # Records stored with published_epoch need no parsing at all
+        if published_epoch is not None:
+            if published_epoch < cutoff_epoch:
+                continue
+        # Canonical UTC timestamps compare correctly as strings, no parse needed
+        elif _is_utc_timestamp(published_str):
+            if published_str[:19] < cutoff_key:
+                continue
+        else:
+            # Skip empty or obviously malformed values without raising
+            if type(published_str) is not str or published_str[4:5] != '-':
+                continue
+            try:
+                published_date = parse_published(published_str)
+            except ValueError:
+                continue
+            if published_date < week_ago:
+                continue
 
-    # Collect domains from weekly papers
-    weekly_domains = []
-    for paper in weekly_papers:
-        weekly_domains.extend(paper.get('medical_domains', []))
+        weekly_count += 1
+        if include_papers:
+            weekly_papers.append(paper)
+        domain_counts.update(paper.get('medical_domains', _EMPTY))
 
-    # Count domain frequencies
-    domain_counts = Counter(weekly_domains)
-    top_weekly_domains = domain_counts.most_common(3)
+    # Partial top-3 selection; no need to sort every domain
+    top_weekly_domains = nlargest(3, domain_counts.items(), key=itemgetter(1))
 
     return {
-        'papers_this_week': len(weekly_papers),
+        'papers_this_week': weekly_count,
         'top_domains': top_weekly_domains,  # [(domain, count), ...]
         'total_papers': len(papers),
         'weekly_papers': weekly_papers
@@ -63,4 +447,9 @@ def format_domain_summary(top_domains: List[tuple]) -> str:
     if not top_domains:
         return "No domains"
 
+    # get_weekly_stats returns (at most) three domains; format those directly
+    if len(top_domains) == 3:
+        (d0, c0), (d1, c1), (d2, c2) = top_domains
+        return f"{d0} ({c0}), {d1} ({c1}), {d2} ({c2})"
+
     return ", ".join([f"{domain} ({count})" for domain, count in top_domains])